@@ -0,0 +1,112 @@
+"""
+Windows 服务状态查询（通过 ctypes 直接调用 advapi32 服务控制管理器 API）
+
+避免每次轮询都启动 sc.exe 子进程并解析随系统语言变化的输出。
+非 Windows 平台导入本模块不会出错，但 query_service_state 会抛出 OSError。
+"""
+
+import ctypes
+import sys
+import threading
+from ctypes import wintypes
+from typing import Optional
+
+SC_MANAGER_CONNECT = 0x0001
+SERVICE_QUERY_STATUS = 0x0004
+SC_STATUS_PROCESS_INFO = 0
+
+ERROR_SERVICE_DOES_NOT_EXIST = 1060
+
+# dwCurrentState 取值
+SERVICE_STOPPED = 1
+SERVICE_START_PENDING = 2
+SERVICE_STOP_PENDING = 3
+SERVICE_RUNNING = 4
+SERVICE_CONTINUE_PENDING = 5
+
+# 与 sc query 解析结果保持一致：STOP_PENDING 视为已停止
+_STATE_NAMES = {
+    SERVICE_STOPPED: "stopped",
+    SERVICE_STOP_PENDING: "stopped",
+    SERVICE_START_PENDING: "starting",
+    SERVICE_CONTINUE_PENDING: "starting",
+    SERVICE_RUNNING: "running",
+}
+
+
+class SERVICE_STATUS_PROCESS(ctypes.Structure):
+    _fields_ = [
+        ("dwServiceType", wintypes.DWORD),
+        ("dwCurrentState", wintypes.DWORD),
+        ("dwControlsAccepted", wintypes.DWORD),
+        ("dwWin32ExitCode", wintypes.DWORD),
+        ("dwServiceSpecificExitCode", wintypes.DWORD),
+        ("dwCheckPoint", wintypes.DWORD),
+        ("dwWaitHint", wintypes.DWORD),
+        ("dwProcessId", wintypes.DWORD),
+        ("dwServiceFlags", wintypes.DWORD),
+    ]
+
+
+_advapi32 = None
+_scm_handle = None
+_scm_lock = threading.Lock()
+
+
+def _load_advapi32():
+    """加载 advapi32 并声明用到的函数签名"""
+    dll = ctypes.WinDLL("advapi32", use_last_error=True)  # type: ignore[attr-defined]
+    dll.OpenSCManagerW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD]
+    dll.OpenSCManagerW.restype = wintypes.HANDLE
+    dll.OpenServiceW.argtypes = [wintypes.HANDLE, wintypes.LPCWSTR, wintypes.DWORD]
+    dll.OpenServiceW.restype = wintypes.HANDLE
+    dll.QueryServiceStatusEx.argtypes = [
+        wintypes.HANDLE, ctypes.c_int, ctypes.c_void_p, wintypes.DWORD, ctypes.POINTER(wintypes.DWORD)
+    ]
+    dll.QueryServiceStatusEx.restype = wintypes.BOOL
+    dll.CloseServiceHandle.argtypes = [wintypes.HANDLE]
+    dll.CloseServiceHandle.restype = wintypes.BOOL
+    return dll
+
+
+def _get_scm():
+    """获取（首次调用时打开）服务控制管理器句柄，进程内复用"""
+    global _advapi32, _scm_handle
+    if _scm_handle is not None:
+        return _advapi32, _scm_handle
+    if not sys.platform.startswith("win"):
+        raise OSError("服务控制管理器仅在 Windows 上可用")
+    with _scm_lock:
+        if _scm_handle is None:
+            dll = _advapi32 or _load_advapi32()
+            handle = dll.OpenSCManagerW(None, None, SC_MANAGER_CONNECT)
+            if not handle:
+                raise ctypes.WinError(ctypes.get_last_error())  # type: ignore[attr-defined]
+            _advapi32 = dll
+            _scm_handle = handle
+    return _advapi32, _scm_handle
+
+
+def query_service_state(name: str) -> Optional[str]:
+    """查询服务状态
+
+    返回 "running"/"stopped"/"starting"/"unknown"；服务不存在时返回 None。
+    其他失败（非 Windows、权限不足等）抛出 OSError，由调用方回退到 sc.exe。
+    """
+    dll, scm = _get_scm()
+    service = dll.OpenServiceW(scm, name, SERVICE_QUERY_STATUS)
+    if not service:
+        error = ctypes.get_last_error()  # type: ignore[attr-defined]
+        if error == ERROR_SERVICE_DOES_NOT_EXIST:
+            return None
+        raise ctypes.WinError(error)  # type: ignore[attr-defined]
+    try:
+        status = SERVICE_STATUS_PROCESS()
+        needed = wintypes.DWORD()
+        if not dll.QueryServiceStatusEx(
+            service, SC_STATUS_PROCESS_INFO, ctypes.byref(status), ctypes.sizeof(status), ctypes.byref(needed)
+        ):
+            raise ctypes.WinError(ctypes.get_last_error())  # type: ignore[attr-defined]
+        return _STATE_NAMES.get(status.dwCurrentState, "unknown")
+    finally:
+        dll.CloseServiceHandle(service)
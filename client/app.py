@@ -1,50 +1,252 @@
 import atexit
 import logging
 import os
+import random
+import socket
 import subprocess
 import sys
 import threading
 import time
-import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import MaxRetryError, ProtocolError
 from urllib3.util.retry import Retry
 
 import requests
 import requests.adapters
 from colorama import Fore, Style, init
 
+# orjson 为可选依赖，序列化/解析更快；不可用时回退到标准库 json（两者都接受 bytes）
+try:
+    import orjson as _json
+    _json_dumps = _json.dumps
+except ImportError:
+    import json as _json  # type: ignore[no-redef]
+
+    def _json_dumps(obj) -> bytes:
+        return _json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
 # 尝试相对导入，如果失败则使用绝对导入
 try:
     from .config import ClientConfig
     from .platform_utils import (
         setup_logging, get_service_status, start_service, stop_service,
-        get_app_status, start_app, stop_app, ping, get_zerotier_ips,
-        get_interface_info
+        get_app_status, start_app, stop_app, fast_ping, get_zerotier_ips,
+        get_interface_info, terminate_active_pings, local_link_up
     )
 except ImportError:
     from client.config import ClientConfig
     from client.platform_utils import (
         setup_logging, get_service_status, start_service, stop_service,
-        get_app_status, start_app, stop_app, ping, get_zerotier_ips,
-        get_interface_info
+        get_app_status, start_app, stop_app, fast_ping, get_zerotier_ips,
+        get_interface_info, terminate_active_pings, local_link_up
     )
 
-init(autoreset=True)
+# 配置重置工具位于项目根目录的 common 包中，以脚本方式单独运行客户端时可能无法导入
+try:
+    from common.reset_config import reset_client_config
+except ImportError:
+    reset_client_config = None
+
+
+class _NoColor:
+    """非终端输出时使用的空颜色常量（不输出任何 ANSI 控制码）"""
+    BLACK = RED = GREEN = YELLOW = BLUE = MAGENTA = CYAN = WHITE = RESET = ""
+    BRIGHT = DIM = NORMAL = RESET_ALL = ""
+
 
+# 仅在交互终端中启用 colorama；重定向到文件或在 systemd 下运行时
+# 既不包装 stdout，也不拼接颜色前缀
+if sys.stdout.isatty():
+    init(autoreset=True)
+else:
+    Fore = Style = _NoColor()  # type: ignore[assignment,misc]
+
+
+# 调度用时钟：单调时钟不受 NTP 校时、手动改时间或休眠唤醒的影响
+_now = time.monotonic
 
 # 常量定义
 MAX_RESTART_FAILURES = 5           # 最大连续重启失败次数
 RESTART_BACKOFF_BASE_SEC = 30      # 基础退避时间(秒)
-SESSION_MAX_AGE_SEC = 3600         # 会话最大生存时间（1小时）
-SESSION_MAX_REQUESTS = 1000        # 会话最大请求数量
+SESSION_MAX_AGE_SEC = 6 * 3600     # 会话最大生存时间（6小时，防止NAT映射过期）
 DEFAULT_TIMEOUT_SEC = 10           # 默认超时时间
 MAX_BACKOFF_EXPONENT = 4           # 最大退避指数（降低以避免过长间隔）
 MAX_BACKOFF_TIME_SEC = 240        # 最大退避时间(4分钟，更合理的上限)
-NETWORK_RECOVERY_WAIT_SEC = 300    # 达到最大失败次数时的等待时间(5分钟)
+NETWORK_RECOVERY_WAIT_SEC = 300    # 达到最大失败次数时的基础等待时间(5分钟)
+MAX_RECOVERY_BACKOFF_EXPONENT = 2  # 网络恢复检测的最大退避指数（最长约 20 分钟 + 抖动）
+SERVER_START_TIMEOUT_SEC = 15      # 启动本地服务端后等待其就绪的最长时间
+SERVER_START_PROBE_MIN_SEC = 0.2   # 等待服务端就绪时的首次探测间隔
+SERVER_START_PROBE_MAX_SEC = 1.5   # 探测间隔按 1.7 倍递增的上限
+MAX_ADAPTIVE_PING_INTERVAL_SEC = 60  # 网络长期稳定时 ping 间隔的放宽上限
+ADAPTIVE_PING_STEP = 10            # 每连续成功多少次，ping 间隔增加一个基础间隔
+RESTART_TOKEN_MAX = 5.0            # 重启令牌桶容量（最多可连续执行的重启次数）
+RESTART_TOKEN_REFILL = 0.1         # 每次 ping 成功补充的令牌数
+RESTART_TOKEN_REFILL_COOLDOWNS = 10  # 即使 ping 一直失败，每经过多少个重启冷却期也补充一个令牌
+STATUS_LOG_BURST = 5               # 网络抖动时状态变化日志的突发上限
+STATUS_LOG_REFILL_SEC = 60         # 超出突发上限后，每隔多少秒允许输出一条状态变化日志
+CIRCUIT_BREAKER_BASE_SEC = 30      # 服务端不可达后后台请求的基础熔断时间
+MAX_CIRCUIT_BREAKER_EXPONENT = 4   # 熔断时间的最大退避指数（最长 8 分钟）
+
+# log_and_print 使用的级别/颜色映射（模块加载时构建一次）
+_LEVEL = {
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "DEBUG": logging.DEBUG,
+}
+_COLOR = {
+    'red': Fore.RED,
+    'green': Fore.GREEN,
+    'yellow': Fore.YELLOW,
+    'blue': Fore.BLUE,
+    'cyan': Fore.CYAN,
+    'magenta': Fore.MAGENTA,
+    'white': Fore.WHITE,
+}
+
+# 客户端列表的 ping 状态显示：(状态文本, 颜色)
+_PING_WAIT = ("待检测", Fore.YELLOW)
+_PING_ON = ("在线", Fore.GREEN)
+_PING_OFF = ("离线", Fore.RED)
+
+
+# 主菜单文本（模块加载时拼接一次）
+_MENU_TEXT = "\n".join([
+    "\n" + "=" * 50,
+    f"{Fore.CYAN}{Style.BRIGHT}ZeroTier Reconnecter 客户端{Style.RESET_ALL}",
+    "=" * 50,
+    "配置管理:",
+    "  1) 设置服务端设备 ZeroTier IP",
+    "  2) 高级：手动设置服务端地址",
+    "  3) 设置服务端API密钥",
+    "  4) 查看当前配置",
+    "  5) 验证配置",
+    "  6) 配置 ZeroTier 路径",
+    "  7) 重置配置设置",
+    "\nZeroTier 管理:",
+    "  8) 启动 ZeroTier 服务",
+    "  9) 停止 ZeroTier 服务",
+    "  10) 启动 ZeroTier 应用",
+    "  11) 停止 ZeroTier 应用",
+    "  12) 执行重启策略",
+    "\n网络功能:",
+    "  13) 向服务端上报本机 IP",
+    "  14) 启动自动治愈",
+    "  15) 停止自动治愈",
+    "  16) 重置自动治愈失败计数",
+    "\n服务端交互:",
+    "  17) 启动本地服务端",
+    "  18) 检查服务端健康状态",
+    "  19) 查看服务端客户端列表",
+    "  20) 查看服务端统计信息",
+    "  21) 查看服务端配置",
+    "  22) 查看服务端状态汇总",
+    "\n状态查看:",
+    "  23) 查看本地系统状态",
+    "  24) 查看网络接口信息",
+    "  25) 调试自动治愈状态",
+    "\n  0) 退出",
+])
+
+
+class JitteredRetry(Retry):
+    """全抖动（full jitter）退避的重试策略：在 [0, 指数退避值] 内均匀取值，
+    避免服务端重启后所有客户端在同一时刻重试"""
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()  # 已按 backoff_max 截断的指数退避值
+        if backoff <= 0:
+            return 0
+        return random.uniform(0, backoff)
+
+
+class _LogRateLimiter:
+    """按键限流的日志令牌桶：网络反复抖动时限制同类日志的输出频率，被抑制的条数在下次输出时汇总"""
+
+    def __init__(self, burst: float, refill_sec: float) -> None:
+        self._burst = burst
+        self._refill_per_sec = 1.0 / refill_sec
+        self._buckets: Dict[str, list] = {}  # 键 -> [令牌数, 上次补充时刻, 已抑制条数]
+
+    def allow(self, key: str) -> Optional[int]:
+        """允许输出时返回此前被抑制的条数（通常为 0），需要抑制时返回 None"""
+        now = _now()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self._burst, now, 0]
+        else:
+            bucket[0] = min(self._burst, bucket[0] + (now - bucket[1]) * self._refill_per_sec)
+            bucket[1] = now
+        if bucket[0] < 1.0:
+            bucket[2] += 1
+            return None
+        bucket[0] -= 1.0
+        suppressed, bucket[2] = bucket[2], 0
+        return suppressed
+
+
+# 空闲连接的 TCP keepalive：空闲 30s 后开始探测，避免 NAT/防火墙在两次请求之间静默丢弃长连接
+_KEEPALIVE_SOCKET_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+for _opt, _val in (("TCP_KEEPIDLE", 30), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3)):
+    if hasattr(socket, _opt):
+        _KEEPALIVE_SOCKET_OPTIONS.append((socket.IPPROTO_TCP, getattr(socket, _opt), _val))
+
+
+_IDEMPOTENT_METHODS = frozenset(["HEAD", "GET", "OPTIONS"])
+
+
+def _is_stale_connection_error(error: requests.exceptions.ConnectionError) -> bool:
+    """连接错误是否来自连接池中已被对端关闭的复用连接（而不是无法建立新连接）"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return False
+    reason = error.args[0] if error.args else None
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    return isinstance(reason, ProtocolError)
+
+
+class KeepAliveAdapter(requests.adapters.HTTPAdapter):
+    """在默认套接字选项（TCP_NODELAY）之上开启 TCP keepalive 的适配器"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault("socket_options", HTTPConnection.default_socket_options + _KEEPALIVE_SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
 
 
 class ClientApp:
+    # 菜单选项 -> 方法名
+    _MENU_ACTIONS = {
+        "1": "set_target_ip",
+        "2": "set_server_base",
+        "3": "set_api_key",
+        "4": "view_config",
+        "5": "validate_config",
+        "6": "configure_zerotier_paths",
+        "7": "reset_config",
+        "8": "start_zerotier_service",
+        "9": "stop_zerotier_service",
+        "10": "start_zerotier_app",
+        "11": "stop_zerotier_app",
+        "12": "restart_strategy",
+        "13": "remember_self",
+        "14": "start_auto_heal",
+        "15": "stop_auto_heal",
+        "16": "reset_failure_count",
+        "17": "start_local_server",
+        "18": "check_server_health",
+        "19": "get_server_clients",
+        "20": "get_server_stats",
+        "21": "get_server_config",
+        "22": "show_server_status",
+        "23": "show_status",
+        "24": "show_network_info",
+        "25": "debug_auto_heal",
+    }
+
     def __init__(self) -> None:
         self.config = ClientConfig.load()
         setup_logging(self.config)
@@ -55,32 +257,79 @@ class ClientApp:
         except Exception as e:
             logging.warning(f"自动发现 ZeroTier 路径时出错: {e}")
         
+        # 请求头缓存：以 API 密钥对象为键，密钥未变更时复用
+        self._cached_headers: Dict[str, str] = {}
+        self._cached_api_key: object = object()
+        
+        # 预先拼好各 API 地址，服务端地址变更时重建
+        self._urls: Dict[str, str] = {}
+        self._rebuild_urls()
+        
         self._stop_event = threading.Event()
+        self._wake_event = threading.Event()  # 唤醒自动治愈循环立即执行下一轮检测
         self._bg_thread: Optional[threading.Thread] = None
         
         # 自动治愈重启失败跟踪
-        self._restart_failure_count = 0  # 连续重启失败次数
+        self._restart_failure_count = 0  # 连续重启失败次数（修改时持有 _failure_lock）
+        self._failure_lock = threading.Lock()  # 后台线程与菜单线程都会修改失败计数
         self._max_restart_failures = MAX_RESTART_FAILURES  # 最大连续失败次数
         self._restart_backoff_base = RESTART_BACKOFF_BASE_SEC  # 基础退避时间(秒)
-        self._last_restart_time = 0.0   # 上次重启时间
+        self._last_restart_time = 0.0   # 上次重启时间（单调时钟）
+        # 重启令牌桶：每次重启消耗一个令牌，ping 成功时缓慢补充；
+        # 故障持续（如控制器宕机）时令牌耗尽，停止无效的重启
+        self._restart_tokens = RESTART_TOKEN_MAX
+        self._restart_tokens_at = _now()  # 上次按时间补充令牌的时刻（单调时钟）
+        self._restart_tokens_exhausted = False  # 是否已记录令牌耗尽（避免重复日志）
+        self._status_log_limiter = _LogRateLimiter(STATUS_LOG_BURST, STATUS_LOG_REFILL_SEC)
         
         # HTTP会话，使用连接池提高性能，添加生命周期管理
         self._session: Optional[requests.Session] = None
-        self._session_created_at = 0.0  # 会话创建时间
+        self._session_created_at = 0.0  # 会话创建时间（单调时钟）
         self._session_max_age = SESSION_MAX_AGE_SEC  # 会话最大生存时间
-        self._session_request_count = 0  # 会话处理的请求数量
-        self._session_max_requests = SESSION_MAX_REQUESTS  # 会话最大请求数量
+        self._session_poisoned = False  # 发生连接错误后标记，下次使用前重建
         self._session_lock = threading.Lock()  # 会话访问锁，确保线程安全
         self._init_session()
         
+        # 熔断器：服务端连接失败/超时后，后台请求在熔断期内直接跳过，不再每次等待超时；
+        # 熔断期满后放行一次探测（半开），成功即恢复，失败则延长熔断时间
+        self._breaker_failures = 0
+        self._breaker_open_until = 0.0  # 单调时钟
+        self._remember_pending = False  # 重启后的上报尚未成功，待退避期满后重试
+        # 补报自身的退避：未找到 IP、服务端报错等非网络失败不计入熔断器，单独退避
+        self._remember_failures = 0
+        self._remember_retry_at = 0.0  # 单调时钟
+        
         # 配置默认超时
         self._default_timeout = DEFAULT_TIMEOUT_SEC
         
+        # 状态探测结果的短期缓存：键 -> (过期时刻(单调时钟), 结果)；启停 ZeroTier 时清空。
+        # 代数在每次清空时递增，清空前已开始的探测结果不再写入缓存
+        self._probe_cache: Dict[str, tuple] = {}
+        self._probe_generation = 0
+        
+        # 状态查看用的线程池：并发执行多个阻塞探测（子进程/HTTP），总耗时取最大值而非总和
+        self._status_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="status")
+        
         # 注册退出清理函数（比 __del__ 更可靠）
         atexit.register(self._cleanup_session)
         
+        # 后台预热连接：首次交互时直接复用已建立的长连接
+        self._status_pool.submit(self._warm_pool)
+        
         logging.info("ZeroTier Reconnecter 客户端已启动")
 
+    def _warm_pool(self):
+        """向服务端发一次 HEAD 探测，提前完成 TCP（及 TLS）握手并放回连接池
+        
+        只建立一条连接：交互和后台检测基本是串行请求，一条长连接即可覆盖。
+        服务端未启动等失败都直接忽略，不影响后续正常请求。
+        """
+        try:
+            self._ensure_session().head(self._urls['health'], timeout=2, allow_redirects=False)
+            logging.debug("HTTP连接预热完成")
+        except Exception as e:
+            logging.debug(f"HTTP连接预热失败（忽略）: {e}")
+
     def _init_session(self):
         """初始化HTTP会话 - 增强资源管理"""
         if self._session is not None:
@@ -89,27 +338,36 @@ class ClientApp:
             
         try:
             self._session = requests.Session()
-            self._session_created_at = time.time()
-            self._session_request_count = 0
+            self._session_created_at = time.monotonic()
+            self._session_poisoned = False
             
-            # 配置连接池参数和重试策略（仅对幂等方法重试）
-            retry_strategy = Retry(
-                total=3,
-                status_forcelist=[429, 500, 502, 503, 504],
-                allowed_methods=["HEAD", "GET", "OPTIONS"],  # 仅对幂等方法重试
-                backoff_factor=1
+            # 配置连接池参数和重试策略：只对连接层面的瞬时故障快速重试，
+            # 5xx/429 直接交给调用方的错误分支处理，避免交互界面长时间阻塞
+            retry_strategy = JitteredRetry(
+                total=2,
+                connect=2,
+                read=0,
+                status=0,
+                backoff_factor=0.3,
+                allowed_methods=_IDEMPOTENT_METHODS,  # 仅对幂等方法重试
+                respect_retry_after_header=False,
+                raise_on_status=False
             )
             
-            # 配置适配器，限制连接池大小防止资源泄漏
-            adapter = requests.adapters.HTTPAdapter(
-                pool_connections=5,     # 连接池数量（增加以支持并发请求）
-                pool_maxsize=10,        # 每个连接池的最大连接数
+            # 配置适配器：只连接单个服务端，连接池数量无需多；最大连接数随并发度伸缩
+            pool_maxsize = self.config.http_pool_maxsize or max(10, (os.cpu_count() or 4) * 5)
+            adapter = KeepAliveAdapter(
+                pool_connections=self.config.http_pool_connections,  # 连接池数量
+                pool_maxsize=pool_maxsize,  # 每个连接池的最大连接数
                 max_retries=retry_strategy,
-                pool_block=True         # 连接池满时阻塞而不是创建新连接
+                pool_block=True         # 连接池满时阻塞而不是创建新连接（保留背压）
             )
             self._session.mount('http://', adapter)
             self._session.mount('https://', adapter)
             
+            # 请求头在会话生命周期内不变，挂在会话上由 requests 合并到每个请求
+            self._apply_session_headers(self._session)
+            
             logging.debug("HTTP会话已初始化，配置了连接池和重试策略")
             
         except Exception as e:
@@ -140,113 +398,197 @@ class ClientApp:
                 logging.error(f"关闭HTTP会话时出错: {e}")
             finally:
                 self._session = None
-                self._session_request_count = 0
 
     def _cleanup_session(self):
         """安全地清理HTTP会话 - 修复连接池泄漏，增强线程安全"""
         with self._session_lock:  # 确保线程安全
             self._cleanup_session_unsafe()
 
-    def _ensure_session(self):
-        """确保HTTP会话可用 - 优化版本，减少锁竞争"""
-        current_time = time.time()
-        
-        # 先进行无锁检查，减少锁竞争
-        should_recreate = (
-            self._session is None or
-            current_time - self._session_created_at > self._session_max_age or
-            self._session_request_count >= self._session_max_requests
-        )
-        
-        if not should_recreate:
-            return
+    def _ensure_session(self) -> requests.Session:
+        """确保HTTP会话可用并返回当前会话 - 热路径无锁
+        
+        热路径只检查会话是否存在、是否因连接错误被标记；
+        超时轮换由 _rotate_stale_session 在后台定期处理。
+        """
+        # 属性读取在 GIL 下是原子的，会话健康时直接返回，不加锁
+        session = self._session
+        if session is not None and not self._session_poisoned:
+            return session
             
         # 只有需要重建时才获取锁
         with self._session_lock:
-            # 双重检查锁定模式，防止重复重建
-            current_time = time.time()
-            should_recreate = (
-                self._session is None or
-                current_time - self._session_created_at > self._session_max_age or
-                self._session_request_count >= self._session_max_requests
-            )
+            # 持锁后复查，防止其他线程已完成重建
+            session = self._session
+            if session is None:
+                reason = "会话不存在"
+            elif self._session_poisoned:
+                reason = "上次请求连接错误"
+            else:
+                return session
             
-            if should_recreate:
-                # 确定重建原因（用于调试）
-                if self._session is None:
-                    reason = "会话不存在"
-                elif current_time - self._session_created_at > self._session_max_age:
-                    reason = f"会话超时({self._session_max_age}s)"
-                else:
-                    reason = f"请求过多({self._session_request_count})"
-                
-                logging.debug(f"重建HTTP会话: {reason}")
-                # 记录会话轮换统计信息（仅info级别，避免日志噪声）
-                if self._session_request_count >= self._session_max_requests:
-                    logging.info(f"HTTP会话已处理 {self._session_request_count} 个请求，重建以保持性能")
-                
-                try:
-                    self._init_session()
-                except Exception as e:
-                    logging.error(f"重建HTTP会话失败: {e}")
-                    # 即使重建失败，也要确保有基本的会话可用
-                    if self._session is None:
-                        try:
-                            self._session = requests.Session()
-                            self._session_created_at = time.time()
-                            self._session_request_count = 0
-                        except Exception as fallback_error:
-                            logging.critical(f"创建备用HTTP会话失败: {fallback_error}")
+            logging.debug(f"重建HTTP会话: {reason}")
+            try:
+                self._init_session()
+            except Exception as e:
+                logging.error(f"重建HTTP会话失败: {e}")
+            
+            session = self._session
+            if session is None:
+                # 即使重建失败，也要确保有基本的会话可用
                 try:
-                    self._init_session()
-                except Exception as e:
-                    logging.error(f"重建HTTP会话失败: {e}")
-                    # 即使重建失败，也要确保有基本的会话可用
-                    if self._session is None:
-                        try:
-                            self._session = requests.Session()
-                            self._session_created_at = time.time()
-                            self._session_request_count = 0
-                        except Exception as fallback_error:
-                            logging.critical(f"创建备用HTTP会话失败: {fallback_error}")
+                    session = requests.Session()
+                    self._apply_session_headers(session)
+                    self._session = session
+                    self._session_created_at = time.monotonic()
+                    self._session_poisoned = False
+                except Exception as fallback_error:
+                    logging.critical(f"创建备用HTTP会话失败: {fallback_error}")
+                    raise
+            return session
     
-    def _record_request(self):
-        """记录请求使用（在实际发起请求后调用）"""
+    def _rotate_stale_session(self):
+        """会话超过最大生存时间时重建（由自动治愈循环的心跳定期调用）"""
+        if self._session is None or time.monotonic() - self._session_created_at <= self._session_max_age:
+            return
         with self._session_lock:
-            if self._session is not None:
-                self._session_request_count += 1
+            # 持锁后复查，防止其他线程已完成重建
+            if self._session is None or time.monotonic() - self._session_created_at <= self._session_max_age:
+                return
+            logging.debug(f"重建HTTP会话: 会话超时({self._session_max_age}s)")
+            try:
+                self._init_session()
+            except Exception as e:
+                logging.error(f"重建HTTP会话失败: {e}")
+
+    def _send(self, method: str, name: str, background: bool = False, **kwargs) -> requests.Response:
+        """向指定 API 发送请求；复用的连接失效时重建会话，幂等请求重试一次
+        
+        失败后再检测而不是每次请求前检测：健康的长连接不受影响，
+        失效的连接（如 NAT 映射过期）在第一次出错时即被替换。
+        无法建立新连接（拒绝/超时）时直接抛出，重试已由适配器的 Retry 负责。
+        只有后台请求（background=True）的失败计入熔断器，交互操作不会让后台上报熔断。
+        """
+        url = self._urls[name]
+        try:
+            try:
+                response = self._ensure_session().request(method, url, **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                if not _is_stale_connection_error(e):
+                    raise
+                # 复用的长连接已被对端关闭：重建会话；只对幂等请求重发，避免重复上报
+                self._session_poisoned = True
+                if method.upper() not in _IDEMPOTENT_METHODS:
+                    raise
+                logging.debug("请求 %s 复用连接已失效，重建会话后重试一次: %s", url, e)
+                response = self._ensure_session().request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if background:
+                self._breaker_trip()
+            raise
+        # 收到任何 HTTP 响应都说明服务端可达
+        self._breaker_reset()
+        return response
+
+    def _breaker_allow(self) -> bool:
+        """熔断器是否放行后台请求（熔断期满后放行，即半开探测）"""
+        return _now() >= self._breaker_open_until
+
+    def _breaker_trip(self):
+        """服务端不可达：打开熔断器，连续失败时熔断时间翻倍（有上限）"""
+        self._breaker_failures += 1
+        exponent = min(self._breaker_failures - 1, MAX_CIRCUIT_BREAKER_EXPONENT)
+        open_sec = CIRCUIT_BREAKER_BASE_SEC * 2 ** exponent
+        self._breaker_open_until = _now() + open_sec
+        logging.debug("服务端不可达，后台请求熔断 %ss (连续失败 %d 次)", open_sec, self._breaker_failures)
+
+    def _breaker_reset(self):
+        if self._breaker_failures:
+            logging.info(f"服务端已恢复，关闭熔断器 (此前连续失败 {self._breaker_failures} 次)")
+            self._breaker_failures = 0
+            self._breaker_open_until = 0.0
+
+    def _cached(self, key: str, ttl: float, func, *args):
+        """在 ttl 秒内复用同一探测的结果，避免连续查看状态时重复启动子进程"""
+        entry = self._probe_cache.get(key)
+        now = _now()
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        generation = self._probe_generation
+        result = func(*args)
+        if generation == self._probe_generation:
+            self._probe_cache[key] = (now + ttl, result)
+        return result
+
+    def _invalidate_probes(self):
+        """ZeroTier 状态已改变：清空探测缓存，并丢弃仍在进行中的旧探测结果"""
+        self._probe_generation += 1
+        self._probe_cache.clear()
 
     # ---- UI 适配方法 ----
     def log_and_print(self, message: str, level: str = "INFO", color: str = "white"):
         """同时记录日志和在UI中显示"""
-        if level == "INFO":
-            logging.info(message)
-        elif level == "WARNING":
-            logging.warning(message)
-        elif level == "ERROR":
-            logging.error(message)
-        elif level == "DEBUG":
-            logging.debug(message)
-
-        color_code = {
-            'red': Fore.RED,
-            'green': Fore.GREEN,
-            'yellow': Fore.YELLOW,
-            'blue': Fore.BLUE,
-            'cyan': Fore.CYAN,
-            'magenta': Fore.MAGENTA,
-            'white': Fore.WHITE
-        }.get(color, Fore.WHITE)
-        print(color_code + message)
+        logging.log(_LEVEL.get(level, logging.INFO), message)
+        print(f"{_COLOR.get(color, Fore.WHITE)}{message}")
+
     def _get_headers(self):
-        """获取请求头，包含认证信息"""
+        """获取请求头，包含认证信息（API密钥不变时复用上次构建的结果，调用方不应修改）"""
+        api_key = self.config.api_key
+        if api_key is self._cached_api_key:
+            return self._cached_headers
         headers = {'Content-Type': 'application/json'}
-        if self.config.api_key:
-            headers['Authorization'] = f'Bearer {self.config.api_key}'
+        if api_key:
+            headers['Authorization'] = f'Bearer {api_key}'
+        self._cached_api_key = api_key
+        self._cached_headers = headers
         return headers
 
-    def _silent_remember_self(self):
-        """向服务端上报本机 IP（静默版本，用于后台线程）"""
+    def _rebuild_urls(self):
+        """根据当前服务端地址重建各 API 地址"""
+        base = self.config.server_base
+        self._urls = {
+            'remember': base + '/clients/remember',
+            'health': base + '/health',
+            'clients': base + '/clients',
+            'stats': base + '/clients/stats',
+            'config': base + '/config',
+        }
+
+    def _apply_session_headers(self, session: requests.Session):
+        """将请求头写入会话（API密钥变更时也调用此方法刷新）"""
+        session.headers.update(self._get_headers())
+        if not self.config.api_key:
+            session.headers.pop('Authorization', None)
+
+    def _silent_remember_self(self, force: bool = False) -> bool:
+        """向服务端上报本机 IP（静默版本，用于后台线程）
+        
+        force=True 时忽略熔断器和退避（重启成功后必须尝试上报）；上报未成功时记为待上报，
+        由自动治愈循环在退避期满、熔断器放行且目标可达时重试。
+        """
+        if not force and not self._remember_retry_allow():
+            logging.debug("服务端熔断中或上报退避中，推迟上报")
+            self._remember_pending = True
+            return False
+        if self._do_silent_remember():
+            self._remember_pending = False
+            self._remember_failures = 0
+            self._remember_retry_at = 0.0
+            return True
+        # 网络错误已由 _send 计入熔断器；这里只为补报本身退避，避免每轮检测都重试
+        self._remember_failures += 1
+        exponent = min(self._remember_failures - 1, MAX_CIRCUIT_BREAKER_EXPONENT)
+        retry_sec = CIRCUIT_BREAKER_BASE_SEC * 2 ** exponent
+        self._remember_retry_at = _now() + retry_sec
+        logging.debug("上报未成功，%ss 后重试 (连续失败 %d 次)", retry_sec, self._remember_failures)
+        self._remember_pending = True
+        return False
+
+    def _remember_retry_allow(self) -> bool:
+        """补报是否可以重试：自身退避期已满且熔断器放行"""
+        return _now() >= self._remember_retry_at and self._breaker_allow()
+
+    def _do_silent_remember(self) -> bool:
+        """执行一次静默上报，成功返回 True"""
         try:
             self._ensure_session()
         except Exception as e:
@@ -260,15 +602,14 @@ class ClientApp:
         
         payload = {"ips": ips}
         try:
-            response = self._session.post(  # type: ignore  # _ensure_session 确保不为 None
-                f"{self.config.server_base}/clients/remember", 
-                json=payload, 
-                timeout=self._default_timeout,
-                headers=self._get_headers()
+            response = self._send(
+                'POST', 'remember',
+                background=True,
+                data=_json_dumps(payload),  # Content-Type 已在会话请求头中
+                timeout=self._default_timeout
             )
-            self._record_request()  # 记录成功发起的请求
             if response.ok:
-                result = response.json()
+                result = _json.loads(response.content)
                 logging.info(f"已成功上报本机 IP: {ips}，服务端总客户端数: {result.get('total_clients', '未知')}")
                 return True
             else:
@@ -291,11 +632,6 @@ class ClientApp:
         print(f"目标服务端: {self.config.server_base}")
         print()
         
-        try:
-            self._ensure_session()
-        except Exception as e:
-            logging.error(f"会话初始化失败: {e}")
-            return False
         try:
             self._ensure_session()
         except Exception as e:
@@ -312,54 +648,43 @@ class ClientApp:
         
         payload = {"ips": ips}
         try:
-            response = self._session.post(  # type: ignore  # _ensure_session 确保不为 None
-                f"{self.config.server_base}/clients/remember", 
-                json=payload, 
-                timeout=self._default_timeout,
-                headers=self._get_headers()
+            response = self._send(
+                'POST', 'remember',
+                data=_json_dumps(payload),  # Content-Type 已在会话请求头中
+                timeout=self._default_timeout
             )
-            self._record_request()  # 记录成功发起的请求
             if response.ok:
-                result = response.json()
+                result = _json.loads(response.content)
                 message = f"✓ 已成功上报本机 IP: {ips}，服务端总客户端数: {result.get('total_clients', '未知')}"
                 self.log_and_print(message, "INFO", "green")
                 return True
             else:
-                # 详细分析错误原因
-                if response.status_code == 404:
-                    if 'nginx' in response.text.lower():
+                # 详细分析错误原因（response.text 每次访问都会重新解码，取一次即可）
+                status = response.status_code
+                body = response.text
+                if status == 404:
+                    if 'nginx' in body.lower():
                         message = f"✗ 上报失败: 服务端返回404 (nginx)"
-                        print(Fore.RED + message)
-                        print(Fore.YELLOW + "可能原因:")
+                        print(f"{Fore.RED}{message}")
+                        print(f"{Fore.YELLOW}可能原因:")
                         print("  1. nginx作为反向代理，但未正确配置到ZeroTier服务端")
                         print("  2. ZeroTier服务端未在nginx配置的后端端口运行")
                         print("  3. 请检查nginx配置或直接连接ZeroTier服务端端口(如:5418)")
                     else:
                         message = f"✗ 上报失败: 404 - 路径不存在，请检查服务端地址是否正确"
-                        print(Fore.RED + message)
-                elif response.status_code == 401:
+                        print(f"{Fore.RED}{message}")
+                elif status == 401:
                     message = f"✗ 上报失败: 401 - 需要API密钥认证，请使用选项3设置API密钥"
-                    print(Fore.RED + message)
-                elif response.status_code == 403:
+                    print(f"{Fore.RED}{message}")
+                elif status == 403:
                     message = f"✗ 上报失败: 403 - API密钥无效，请检查密钥是否正确"
-                    print(Fore.RED + message)
+                    print(f"{Fore.RED}{message}")
                 else:
-                    message = f"✗ 上报失败: HTTP {response.status_code}"
-                    print(Fore.RED + message)
-                    print(f"响应内容: {response.text[:200]}")
+                    message = f"✗ 上报失败: HTTP {status}"
+                    print(f"{Fore.RED}{message}")
+                    print(f"响应内容: {body[:200]}")
                 
-                logging.error(f"上报失败: {response.status_code} {response.text}")
-                return False
-        except requests.exceptions.Timeout as e:
-            message = f"✗ 上报超时: 服务端响应时间过长"
-            self.log_and_print(message, "WARNING", "yellow")
-            logging.warning(f"服务端上报超时: {e}")
-            return False
-        except requests.exceptions.ConnectionError as e:
-            message = f"✗ 上报失败: 无法连接到服务端"
-            self.log_and_print(message, "WARNING", "yellow")
-            logging.warning(f"服务端连接错误: {e}")
-            return False
+                logging.error(f"上报失败: {status} {body}")
                 return False
         except requests.exceptions.Timeout as e:
             message = f"✗ 上报超时: 服务端响应时间过长"
@@ -383,8 +708,9 @@ class ClientApp:
         print()
         
         # 检查是否已有服务端在运行
-        if self.check_server_health(silent=True):
-            print(Fore.YELLOW + "检测到服务端已在运行中")
+        restarting = self._probe_server_ready()
+        if restarting:
+            print(f"{Fore.YELLOW}检测到服务端已在运行中")
             server_url = self.config.server_base
             print(f"服务端地址: {server_url}")
             
@@ -398,14 +724,12 @@ class ClientApp:
             print("正在启动服务端...")
         
         try:
-            from pathlib import Path
-            
             # 获取当前项目根目录
             project_root = Path(__file__).parent.parent
             main_py_path = project_root / "main.py"
             
             if not main_py_path.exists():
-                print(Fore.RED + "错误: 找不到 main.py 文件")
+                print(f"{Fore.RED}错误: 找不到 main.py 文件")
                 return
             
             # 构建启动命令
@@ -414,6 +738,7 @@ class ClientApp:
             print(f"执行命令: {' '.join(cmd)}")
             print("服务端将在后台运行...")
             
+            launched_at = time.monotonic()
             # 在新窗口中启动服务端（Windows）
             if sys.platform == "win32":
                 # 使用 creationflags 在新窗口中启动，避免管道阻塞
@@ -425,51 +750,87 @@ class ClientApp:
                     stderr=subprocess.DEVNULL
                 )
             else:
-                # Linux/Mac 使用正确的后台启动方式
-                # 使用shell=True配合nohup和重定向，或使用start_new_session
-                if hasattr(os, 'setsid'):
-                    # 使用进程组分离的方式（推荐）
-                    subprocess.Popen(
-                        cmd,
-                        cwd=str(project_root),
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
-                        preexec_fn=os.setsid
-                    )
-                else:
-                    # 回退到shell方式
-                    cmd_str = ' '.join(cmd) + ' >/dev/null 2>&1 &'
-                    subprocess.Popen(
-                        cmd_str,
-                        shell=True,
-                        cwd=str(project_root)
-                    )
+                # Linux/Mac 在新会话中启动，与当前终端分离
+                # start_new_session 不需要 preexec_fn 回调，可走 posix_spawn/vfork 快速路径，
+                # 在有后台线程的进程中也是安全的
+                subprocess.Popen(
+                    cmd,
+                    cwd=str(project_root),
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True
+                )
             
-            print(Fore.GREEN + "服务端启动命令已执行")
-            print("请等待几秒钟，然后检查服务端健康状态...")
+            print(f"{Fore.GREEN}服务端启动命令已执行")
             
-            # 等待服务端启动
-            print("等待服务端启动", end="")
-            for i in range(5):
-                time.sleep(1)
-                print(".", end="", flush=True)
+            # 等待服务端启动：指数退避探测（有上限），服务端一就绪立即结束等待；
+            # 进度点按固定节奏输出，与探测频率无关
+            print("等待服务端启动", end="", flush=True)
+            start = time.monotonic()
+            deadline = start + SERVER_START_TIMEOUT_SEC
+            next_dot = start + 0.5
+            delay = SERVER_START_PROBE_MIN_SEC
+            started = False
+            while True:
+                # 重启时只认启动命令之后才开始运行的实例
+                if self._probe_server_ready(launched_at=launched_at if restarting else None):
+                    started = True
+                    break
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                next_probe = min(now + delay, deadline)
+                while True:
+                    now = time.monotonic()
+                    if now >= next_probe:
+                        break
+                    if now >= next_dot:
+                        print(".", end="", flush=True)
+                        next_dot = now + 0.5
+                    time.sleep(min(next_probe, next_dot) - now)
+                delay = min(delay * 1.7, SERVER_START_PROBE_MAX_SEC)
             print()
             
             # 检查服务端是否成功启动
-            if self.check_server_health(silent=True):
-                print(Fore.GREEN + "✓ 服务端启动成功！")
+            if started:
+                print(f"{Fore.GREEN}✓ 服务端启动成功！")
                 print(f"服务端地址: {self.config.server_base}")
                 logging.info("用户启动本地服务端成功")
+            elif restarting and self._probe_server_ready():
+                print(f"{Fore.YELLOW}旧服务端仍在运行，新实例未能接管端口，请先停止旧服务端后重试")
+                logging.warning("重启本地服务端失败: 旧实例仍在运行")
             else:
-                print(Fore.YELLOW + "服务端可能正在启动中...")
+                print(f"{Fore.YELLOW}服务端可能正在启动中...")
                 print("请稍后手动检查服务端健康状态")
                 logging.warning("本地服务端启动后健康检查失败")
                 
         except Exception as e:
             message = f"启动服务端时发生错误: {e}"
-            print(Fore.RED + message)
+            print(f"{Fore.RED}{message}")
             logging.error(f"启动本地服务端异常: {e}")
 
+    def _probe_server_ready(self, timeout: float = 1.0, launched_at: Optional[float] = None) -> bool:
+        """用一次不重试的请求判断服务端是否就绪
+        
+        不经过共享会话：不触发适配器重试、会话重建和熔断计数，适合启动期间的密集探测。
+        HEAD /health 返回 2xx 视为就绪；旧版服务端没有 HEAD 路由，返回 405 也视为就绪，
+        其他状态码（如反向代理的 404/502、端口被其他服务占用）不算。
+        给出 launched_at（启动命令执行时的单调时钟）时改用 GET /health，并要求服务端运行时长
+        不超过启动后经过的时间，避免把重启前仍在运行的旧实例误判为新实例已就绪。
+        """
+        url = self._urls['health']
+        try:
+            if launched_at is None:
+                response = requests.head(url, timeout=timeout, allow_redirects=False)
+                return response.ok or response.status_code == 405
+            response = requests.get(url, timeout=timeout, allow_redirects=False)
+            if not response.ok:
+                return False
+            uptime = _json.loads(response.content).get('uptime_seconds')
+            return isinstance(uptime, (int, float)) and uptime <= time.monotonic() - launched_at + 0.5
+        except (requests.exceptions.RequestException, ValueError, AttributeError):
+            return False
+
     def check_server_health(self, silent=False):
         """检查服务端健康状态"""
         if not silent:
@@ -480,106 +841,96 @@ class ClientApp:
         except Exception as e:
             if not silent:
                 message = f"会话初始化失败: {e}"
-                print(Fore.RED + message)
-                logging.error(message)
-            return False
-        try:
-            self._ensure_session()
-        except Exception as e:
-            if not silent:
-                message = f"会话初始化失败: {e}"
-                print(Fore.RED + message)
+                print(f"{Fore.RED}{message}")
                 logging.error(message)
             return False
         
         try:
-            response = self._session.get(  # type: ignore  # _ensure_session 确保不为 None
-                f"{self.config.server_base}/health", 
-                timeout=self._default_timeout,
-                headers=self._get_headers()
+            if silent:
+                # 静默探测只关心是否存活：用 HEAD 跳过响应体的下载和解析
+                response = self._send(
+                    'HEAD', 'health',
+                    timeout=self._default_timeout,
+                    allow_redirects=False
+                )
+                if response.status_code != 405:
+                    logging.debug("服务端存活探测: HTTP %s", response.status_code)
+                    return response.ok
+                # 旧版服务端不支持 HEAD，回退到 GET
+            
+            response = self._send(
+                'GET', 'health',
+                timeout=self._default_timeout
             )
-            self._record_request()  # 记录成功发起的请求
             if response.ok:
-                data = response.json()
+                data = _json.loads(response.content)
                 clients_info = data.get('clients', {})
                 total = clients_info.get('total', 0) if isinstance(clients_info, dict) else clients_info
                 
                 if not silent:
                     message = f"服务端正常，客户端数量: {total}"
-                    print(Fore.GREEN + message)
+                    print(f"{Fore.GREEN}{message}")
                 
                 # 降低日志噪声：详细数据改为debug级别，info只记录摘要
                 if not silent:
                     logging.info(f"服务端健康检查成功，客户端数量: {total}")
-                logging.debug(f"服务端详细状态: {data}")
+                logging.debug("服务端详细状态: %s", data)  # 惰性格式化：DEBUG 关闭时不生成 repr
                 return True
             else:
                 if not silent:
                     message = f"服务端健康检查失败: HTTP {response.status_code}"
-                    print(Fore.RED + message)
+                    print(f"{Fore.RED}{message}")
                     logging.error(f"{message}, 响应: {response.text[:200]}")
                 return False
         except requests.exceptions.ConnectionError as e:
             if not silent:
                 message = f"无法连接到服务端: 连接被拒绝"
-                print(Fore.RED + message)
+                print(f"{Fore.RED}{message}")
                 logging.error(f"服务端连接错误: {e}")
             else:
                 logging.debug(f"服务端连接错误: {e}")
-            else:
-                logging.debug(f"服务端连接错误: {e}")
             return False
         except requests.exceptions.Timeout as e:
             if not silent:
                 message = f"服务端连接超时"
-                print(Fore.RED + message)
+                print(f"{Fore.RED}{message}")
                 logging.error(f"服务端超时: {e}")
             else:
                 logging.debug(f"服务端超时: {e}")
-            else:
-                logging.debug(f"服务端超时: {e}")
             return False
         except requests.exceptions.RequestException as e:
             if not silent:
                 message = f"请求服务端时发生错误: {type(e).__name__}"
-                print(Fore.RED + message)
+                print(f"{Fore.RED}{message}")
                 logging.error(f"服务端请求错误: {e}")
             else:
                 logging.debug(f"服务端请求错误: {e}")
-            else:
-                logging.debug(f"服务端请求错误: {e}")
             return False
         except (ValueError, KeyError) as e:
             message = f"服务端响应格式错误"
             if not silent:
-                print(Fore.RED + message)
-            if not silent:
-                print(Fore.RED + message)
+                print(f"{Fore.RED}{message}")
             logging.error(f"服务端响应解析错误: {e}")
             return False
         except Exception as e:
             message = f"检查服务端时发生未知错误: {type(e).__name__}"
             if not silent:
-                print(Fore.RED + message)
-            if not silent:
-                print(Fore.RED + message)
+                print(f"{Fore.RED}{message}")
             logging.error(f"服务端健康检查未知错误: {e}")
             return False
 
     def get_server_clients(self):
         """获取服务端客户端列表"""
-        self._ensure_session()
-        
         try:
-            response = self._session.get(  # type: ignore  # _ensure_session 确保不为 None
-                f"{self.config.server_base}/clients", 
-                timeout=5,
-                headers=self._get_headers()
+            response = self._send(
+                'GET', 'clients',
+                timeout=5
             )
-            self._record_request()  # 记录成功发起的请求
             if response.ok:
-                clients = response.json()
-                print(Fore.CYAN + f"服务端客户端列表 (共 {len(clients)} 个):")
+                clients = _json.loads(response.content)
+                # 先拼好所有行再一次性写出，避免每行都获取一次 stdout 锁
+                reset = Style.RESET_ALL
+                lines = [f"{Fore.CYAN}服务端客户端列表 (共 {len(clients)} 个):{reset}"]
                 for ip, info in clients.items():
                     last_seen_timestamp = info.get('last_seen', 0)
                     if last_seen_timestamp > 0:
@@ -587,98 +938,121 @@ class ClientApp:
                     else:
                         last_seen = "未上报"
                     
-                    last_ping_ok = info.get('last_ping_ok', False)
-                    last_ping_at = info.get('last_ping_at', 0)
-                    
                     # 改进状态判断：区分未检测、在线、离线三种状态
-                    if last_ping_at == 0:
-                        ping_status = "待检测"
-                        color = Fore.YELLOW
-                    elif last_ping_ok:
-                        ping_status = "在线"
-                        color = Fore.GREEN
-                    else:
-                        ping_status = "离线"
-                        color = Fore.RED
-                    
-                    print(f"  {ip}: {color}{ping_status}{Style.RESET_ALL} (最后上报: {last_seen})")
+                    ping_status, color = (
+                        _PING_WAIT if info.get('last_ping_at', 0) == 0
+                        else (_PING_ON if info.get('last_ping_ok', False) else _PING_OFF)
+                    )
+                    lines.append(f"  {ip}: {color}{ping_status}{reset} (最后上报: {last_seen})")
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
                 logging.info(f"获取到 {len(clients)} 个客户端信息")
                 return clients
             else:
                 message = f"获取客户端列表失败: {response.status_code}"
-                print(Fore.RED + message)
+                print(f"{Fore.RED}{message}")
                 logging.error(message)
                 return None
         except Exception as e:
             message = f"获取客户端列表异常: {e}"
-            print(Fore.RED + message)
+            print(f"{Fore.RED}{message}")
             logging.error(message)
             return None
 
     def get_server_stats(self):
         """获取服务端统计信息"""
-        self._ensure_session()
-        
         try:
-            response = self._session.get(  # type: ignore  # _ensure_session 确保不为 None
-                f"{self.config.server_base}/clients/stats", 
-                timeout=5,
-                headers=self._get_headers()
+            response = self._send(
+                'GET', 'stats',
+                timeout=5
             )
-            self._record_request()  # 记录成功发起的请求
             if response.ok:
-                stats = response.json()
-                print(Fore.CYAN + "服务端统计信息:")
-                print(f"  总客户端数: {stats.get('total', 0)}")
-                print(f"  活跃客户端: {stats.get('active', 0)}")
-                print(f"  在线客户端: {Fore.GREEN}{stats.get('online', 0)}{Style.RESET_ALL}")
-                print(f"  离线客户端: {Fore.RED}{stats.get('offline', 0)}{Style.RESET_ALL}")
-                print(f"  待检测客户端: {Fore.YELLOW}{stats.get('never_pinged', 0)}{Style.RESET_ALL}")
+                stats = _json.loads(response.content)
+                self._print_server_stats(stats)
                 logging.info(f"获取服务端统计: {stats}")
                 return stats
             else:
                 message = f"获取统计信息失败: {response.status_code}"
-                print(Fore.RED + message)
+                print(f"{Fore.RED}{message}")
                 logging.error(message)
                 return None
         except Exception as e:
             message = f"获取统计信息异常: {e}"
-            print(Fore.RED + message)
+            print(f"{Fore.RED}{message}")
             logging.error(message)
             return None
 
     def get_server_config(self):
         """获取服务端配置"""
-        self._ensure_session()
-        
         try:
-            response = self._session.get(  # type: ignore  # _ensure_session 确保不为 None
-                f"{self.config.server_base}/config", 
-                timeout=5,
-                headers=self._get_headers()
+            response = self._send(
+                'GET', 'config',
+                timeout=5
             )
-            self._record_request()  # 记录成功发起的请求
             if response.ok:
-                config = response.json()
-                print(Fore.CYAN + "服务端配置:")
-                print(f"  Ping 间隔: {config.get('ping_interval_sec', 0)} 秒")
-                print(f"  Ping 超时: {config.get('ping_timeout_sec', 0)} 秒")
-                print(f"  最大并发Ping: {config.get('max_concurrent_pings', 0)}")
-                print(f"  客户端离线阈值: {config.get('client_offline_threshold_sec', 0)} 秒")
-                print(f"  日志级别: {config.get('log_level', 'unknown')}")
+                config = _json.loads(response.content)
+                self._print_server_config(config)
                 logging.info(f"获取服务端配置: {config}")
                 return config
             else:
                 message = f"获取服务端配置失败: {response.status_code}"
-                print(Fore.RED + message)
+                print(f"{Fore.RED}{message}")
                 logging.error(message)
                 return None
         except Exception as e:
             message = f"获取服务端配置异常: {e}"
-            print(Fore.RED + message)
+            print(f"{Fore.RED}{message}")
             logging.error(message)
             return None
 
+    @staticmethod
+    def _print_server_stats(stats: dict):
+        """显示服务端统计信息"""
+        print(f"{Fore.CYAN}服务端统计信息:")
+        print(f"  总客户端数: {stats.get('total', 0)}")
+        print(f"  活跃客户端: {stats.get('active', 0)}")
+        print(f"  在线客户端: {Fore.GREEN}{stats.get('online', 0)}{Style.RESET_ALL}")
+        print(f"  离线客户端: {Fore.RED}{stats.get('offline', 0)}{Style.RESET_ALL}")
+        print(f"  待检测客户端: {Fore.YELLOW}{stats.get('never_pinged', 0)}{Style.RESET_ALL}")
+
+    @staticmethod
+    def _print_server_config(config: dict):
+        """显示服务端配置"""
+        print(f"{Fore.CYAN}服务端配置:")
+        print(f"  Ping 间隔: {config.get('ping_interval_sec', 0)} 秒")
+        print(f"  Ping 超时: {config.get('ping_timeout_sec', 0)} 秒")
+        print(f"  最大并发Ping: {config.get('max_concurrent_pings', 0)}")
+        print(f"  客户端离线阈值: {config.get('client_offline_threshold_sec', 0)} 秒")
+        print(f"  日志级别: {config.get('log_level', 'unknown')}")
+
+    def _fetch_json(self, name: str, timeout: float):
+        """GET 指定 API 并解析 JSON，失败时返回 None（不输出到界面）"""
+        try:
+            response = self._send('GET', name, timeout=timeout)
+            if response.ok:
+                return _json.loads(response.content)
+            logging.error(f"请求服务端 {name} 失败: HTTP {response.status_code}")
+        except requests.exceptions.ConnectionError as e:
+            logging.error(f"请求服务端 {name} 连接错误: {e}")
+        except Exception as e:
+            logging.error(f"请求服务端 {name} 异常: {e}")
+        return None
+
+    def refresh_all(self, names=('health', 'stats', 'config')) -> Dict[str, Optional[dict]]:
+        """并发获取多个服务端 API，返回 {名称: 数据或 None}
+        
+        各请求共用同一个会话的连接池（每个线程各自持有自己的响应），
+        总耗时约为一次往返而不是多次往返之和。
+        """
+        futures = {
+            name: self._status_pool.submit(
+                self._fetch_json, name,
+                self._default_timeout if name == 'health' else 5
+            )
+            for name in names
+        }
+        return {name: future.result() for name, future in futures.items()}
+
     # ---- 配置管理 ----
     def set_target_ip(self):
         """设置服务端设备 IP"""
@@ -698,47 +1072,48 @@ class ClientApp:
             # 同时设置服务端地址为该IP的5418端口
             server_url = f"http://{ip}:5418"
             self.config.server_base = server_url
+            self._rebuild_urls()
             
             self.config.save()
             message = f"已保存服务端设备 IP: {ip}"
-            print(Fore.GREEN + message)
-            print(Fore.GREEN + f"服务端地址已自动设置为: {server_url}")
+            print(f"{Fore.GREEN}{message}")
+            print(f"{Fore.GREEN}服务端地址已自动设置为: {server_url}")
             logging.info(f"设置服务端设备 IP: {ip}, 服务端地址: {server_url}")
             
             # 测试设备连通性
             print("\n正在测试设备连通性...")
-            if ping(ip, self.config.ping_timeout_sec):
+            if fast_ping(ip, self.config.ping_timeout_sec):
                 message = "✓ 设备网络连通"
-                print(Fore.GREEN + message)
+                print(f"{Fore.GREEN}{message}")
                 logging.info(f"服务端设备 {ip} 网络可达")
                 
                 # 测试服务端API连接
                 print("正在测试服务端API连接...")
                 if self.check_server_health(silent=True):
                     message = "✓ 服务端API连接正常"
-                    print(Fore.GREEN + message)
+                    print(f"{Fore.GREEN}{message}")
                     
                     # 尝试上报本机IP
                     print("\n尝试上报本机 IP...")
                     self.remember_self()
                 else:
-                    print(Fore.RED + "✗ 服务端API连接失败")
-                    print(Fore.YELLOW + "可能原因:")
+                    print(f"{Fore.RED}✗ 服务端API连接失败")
+                    print(f"{Fore.YELLOW}可能原因:")
                     print("  1. 服务端程序未在目标设备上运行")
                     print("  2. 服务端程序运行在非5418端口")
                     print("  3. 防火墙阻止了5418端口访问")
                     print("  4. 需要API密钥认证（使用选项3设置）")
             else:
                 message = "✗ 设备网络不通"
-                print(Fore.RED + message)
-                print(Fore.YELLOW + "请检查:")
+                print(f"{Fore.RED}{message}")
+                print(f"{Fore.YELLOW}请检查:")
                 print("  1. 设备IP地址是否正确")
                 print("  2. 两台设备是否在同一ZeroTier网络中")
                 print("  3. ZeroTier服务是否正常运行")
                 logging.warning(f"服务端设备 {ip} 网络不可达")
         else:
             message = "未输入 IP"
-            print(Fore.YELLOW + message)
+            print(f"{Fore.YELLOW}{message}")
             logging.warning("用户未输入服务端设备IP")
 
     def set_server_base(self):
@@ -757,54 +1132,56 @@ class ClientApp:
             if not url.startswith(('http://', 'https://')):
                 url = 'http://' + url
             
-            self.config.server_base = url.rstrip('/')
+            server_base = url.rstrip('/')
+            self.config.server_base = server_base
+            self._rebuild_urls()
             errors = self.config.validate()
             
             if errors:
-                print(Fore.RED + "配置验证失败:")
+                print(f"{Fore.RED}配置验证失败:")
                 for error in errors:
                     print(f"  - {error}")
                 logging.error(f"服务端地址配置验证失败: {errors}")
                 return
             
             self.config.save()
-            message = f"已保存服务端地址: {self.config.server_base}"
-            print(Fore.GREEN + message)
-            logging.info(f"手动设置服务端地址: {self.config.server_base}")
+            message = f"已保存服务端地址: {server_base}"
+            print(f"{Fore.GREEN}{message}")
+            logging.info(f"手动设置服务端地址: {server_base}")
             
             # 测试连接，提供详细的错误诊断
             print("正在测试服务端连接...")
             if self.check_server_health(silent=True):
                 message = "✓ 服务端连接测试成功"
-                print(Fore.GREEN + message)
+                print(f"{Fore.GREEN}{message}")
                 logging.info(message)
             else:
-                print(Fore.RED + "✗ 服务端连接测试失败")
-                print(Fore.YELLOW + "常见问题排查:")
+                print(f"{Fore.RED}✗ 服务端连接测试失败")
+                print(f"{Fore.YELLOW}常见问题排查:")
                 print("  1. 检查服务端是否在指定地址和端口运行")
                 print("  2. 检查防火墙是否阻止了连接")
                 print("  3. 如果使用nginx代理，检查nginx配置")
                 print("  4. 确认端口号正确（默认5418）")
                 
                 # 提供端口扫描建议
-                import urllib.parse
-                parsed = urllib.parse.urlparse(self.config.server_base)
+                parsed = urlparse(server_base)
                 if parsed.hostname:
                     print(f"  5. 尝试telnet {parsed.hostname} {parsed.port or 5418} 测试端口连通性")
                 
                 logging.warning("服务端连接测试失败，已显示排查建议")
         else:
             message = "未输入地址"
-            print(Fore.YELLOW + message)
+            print(f"{Fore.YELLOW}{message}")
             logging.warning("用户未输入服务端地址")
 
     def configure_zerotier_paths(self):
         """配置 ZeroTier 路径"""
+        cfg = self.config
         print("当前 ZeroTier 配置:")
-        print(f"  服务名称: {self.config.zerotier_service_names}")
-        print(f"  程序路径: {self.config.zerotier_bin_paths}")
-        print(f"  GUI 路径: {self.config.zerotier_gui_paths}")
-        print(f"  适配器关键词: {self.config.zerotier_adapter_keywords}")
+        print(f"  服务名称: {cfg.zerotier_service_names}")
+        print(f"  程序路径: {cfg.zerotier_bin_paths}")
+        print(f"  GUI 路径: {cfg.zerotier_gui_paths}")
+        print(f"  适配器关键词: {cfg.zerotier_adapter_keywords}")
         print()
         
         choice = input("是否要修改? (y/N): ")
@@ -813,35 +1190,36 @@ class ClientApp:
             return
         
         # 这里可以添加更详细的配置修改逻辑
-        message = f"配置修改功能待完善，请直接编辑配置文件: {self.config.get_config_path()}"
-        print(Fore.YELLOW + message)
+        message = f"配置修改功能待完善，请直接编辑配置文件: {cfg.get_config_path()}"
+        print(f"{Fore.YELLOW}{message}")
         logging.info("用户尝试修改ZeroTier路径配置")
 
     def view_config(self):
         """查看当前配置"""
+        cfg = self.config
         print("—— 当前配置 ——")
-        print(f"服务端设备IP: {self.config.target_ip or '未设置'}")
-        print(f"服务端地址: {self.config.server_base}")
-        print(f"API密钥: {'***已设置***' if self.config.api_key else '未设置'}")
-        print(f"Ping 间隔: {self.config.ping_interval_sec} 秒")
-        print(f"Ping 超时: {self.config.ping_timeout_sec} 秒")
-        print(f"重启冷却: {self.config.restart_cooldown_sec} 秒")
-        print(f"自动治愈: {'已启用' if self.config.auto_heal_enabled else '已禁用'}")
-        print(f"日志级别: {self.config.log_level}")
-        print(f"配置文件: {self.config.get_config_path()}")
+        print(f"服务端设备IP: {cfg.target_ip or '未设置'}")
+        print(f"服务端地址: {cfg.server_base}")
+        print(f"API密钥: {'***已设置***' if cfg.api_key else '未设置'}")
+        print(f"Ping 间隔: {cfg.ping_interval_sec} 秒")
+        print(f"Ping 超时: {cfg.ping_timeout_sec} 秒")
+        print(f"重启冷却: {cfg.restart_cooldown_sec} 秒")
+        print(f"自动治愈: {'已启用' if cfg.auto_heal_enabled else '已禁用'}")
+        print(f"日志级别: {cfg.log_level}")
+        print(f"配置文件: {cfg.get_config_path()}")
         logging.info("用户查看配置信息")
 
     def validate_config(self):
         """验证配置"""
         errors = self.config.validate()
         if errors:
-            print(Fore.RED + "配置验证失败:")
+            print(f"{Fore.RED}配置验证失败:")
             for error in errors:
                 print(f"  - {error}")
             logging.error(f"配置验证失败: {errors}")
         else:
             message = "配置验证通过"
-            print(Fore.GREEN + message)
+            print(f"{Fore.GREEN}{message}")
             logging.info(message)
 
     def set_api_key(self):
@@ -853,13 +1231,18 @@ class ClientApp:
         self.config.api_key = key
         self.config.save()
         
+        # 同步更新已有会话上的认证头
+        session = self._session
+        if session is not None:
+            self._apply_session_headers(session)
+        
         if key:
             message = "已保存API密钥"
-            print(Fore.GREEN + message)
+            print(f"{Fore.GREEN}{message}")
             logging.info("设置API密钥")
         else:
             message = "已清除API密钥"
-            print(Fore.YELLOW + message)
+            print(f"{Fore.YELLOW}{message}")
             logging.info("清除API密钥")
 
     def reset_config(self):
@@ -875,22 +1258,21 @@ class ClientApp:
         confirm = input(f"确认{confirm_msg}？ (y/N): ").strip().lower()
         
         if confirm != 'y':
-            print(Fore.YELLOW + "已取消重置操作")
+            print(f"{Fore.YELLOW}已取消重置操作")
             return
         
         try:
             # 使用common模块中的重置功能
-            from pathlib import Path
-            common_path = Path(__file__).parent.parent / "common"
-            sys.path.insert(0, str(common_path))
-            
-            from common.reset_config import reset_client_config
+            if reset_client_config is None:
+                print(f"{Fore.RED}无法加载配置重置模块 common.reset_config")
+                logging.error("重置配置失败: common.reset_config 不可用")
+                return
             
             print(f"\n正在{confirm_msg}...")
             success = reset_client_config(preserve_settings=preserve_settings)
             
             if success:
-                print(Fore.GREEN + "配置重置成功！")
+                print(f"{Fore.GREEN}配置重置成功！")
                 print("建议重新启动客户端以应用新配置")
                 logging.info(f"用户重置客户端配置，保留设置: {preserve_settings}")
                 
@@ -901,188 +1283,322 @@ class ClientApp:
                     logging.info("用户选择退出以重新启动")
                     sys.exit(0)
             else:
-                print(Fore.RED + "配置重置失败，请查看错误信息")
+                print(f"{Fore.RED}配置重置失败，请查看错误信息")
                 logging.error("客户端配置重置失败")
                 
         except Exception as e:
             message = f"重置配置时发生错误: {e}"
-            print(Fore.RED + message)
+            print(f"{Fore.RED}{message}")
             logging.error(f"重置配置异常: {e}")
 
     # ---- ZeroTier 管理 ----
+    def _rediscover_paths(self):
+        """启动失败后重新合并自动发现的路径
+        
+        找不到可执行文件时 platform_utils 已清除路径缓存，此处会重新扫描，
+        识别重新安装到新位置的 ZeroTier；其他失败原因下直接复用缓存结果。
+        """
+        try:
+            self.config.auto_discover_zerotier_paths()
+        except Exception as e:
+            logging.debug("重新发现 ZeroTier 路径失败: %s", e)
+
     def _silent_start_zerotier_service(self):
         """启动 ZeroTier 服务（静默版本）"""
         success = start_service(self.config)
+        self._invalidate_probes()
+        if not success:
+            self._rediscover_paths()
         logging.info(f"ZeroTier服务启动{'成功' if success else '失败'}")
         return success
 
     def _silent_stop_zerotier_service(self):
         """停止 ZeroTier 服务（静默版本）"""
         success = stop_service(self.config)
+        self._invalidate_probes()
         logging.info(f"ZeroTier服务停止{'成功' if success else '失败'}")
         return success
 
     def _silent_start_zerotier_app(self):
         """启动 ZeroTier 应用（静默版本）"""
         success = start_app(self.config)
+        self._invalidate_probes()
+        if not success:
+            self._rediscover_paths()
         logging.info(f"ZeroTier应用启动{'成功' if success else '失败'}")
         return success
 
     def _silent_stop_zerotier_app(self):
         """停止 ZeroTier 应用（静默版本）"""
         success = stop_app()
+        self._invalidate_probes()
         logging.info(f"ZeroTier应用停止{'成功' if success else '失败'}")
         return success
 
     def start_zerotier_service(self):
         """启动 ZeroTier 服务"""
         success = start_service(self.config)
+        self._invalidate_probes()
+        if not success:
+            self._rediscover_paths()
         message = "服务启动成功" if success else "服务启动失败"
         color = Fore.GREEN if success else Fore.RED
-        print(color + message)
+        print(f"{color}{message}")
         logging.info(f"ZeroTier服务启动{'成功' if success else '失败'}")
+        self.kick()
         return success
 
     def stop_zerotier_service(self):
         """停止 ZeroTier 服务"""
         success = stop_service(self.config)
+        self._invalidate_probes()
         message = "服务停止成功" if success else "服务停止失败"
         color = Fore.GREEN if success else Fore.RED
-        print(color + message)
+        print(f"{color}{message}")
         logging.info(f"ZeroTier服务停止{'成功' if success else '失败'}")
+        self.kick()
         return success
 
     def start_zerotier_app(self):
         """启动 ZeroTier 应用"""
         success = start_app(self.config)
+        self._invalidate_probes()
+        if not success:
+            self._rediscover_paths()
         message = "应用启动成功" if success else "应用启动失败"
         color = Fore.GREEN if success else Fore.RED
-        print(color + message)
+        print(f"{color}{message}")
         logging.info(f"ZeroTier应用启动{'成功' if success else '失败'}")
+        self.kick()
         return success
 
     def stop_zerotier_app(self):
         """停止 ZeroTier 应用"""
         success = stop_app()
+        self._invalidate_probes()
         message = "应用停止成功" if success else "应用停止失败"
         color = Fore.GREEN if success else Fore.RED
-        print(color + message)
+        print(f"{color}{message}")
         logging.info(f"ZeroTier应用停止{'成功' if success else '失败'}")
+        self.kick()
         return success
 
+    def _record_restart_failure(self) -> int:
+        """重启失败计数加一（加锁的读-改-写），返回新的计数"""
+        with self._failure_lock:
+            self._restart_failure_count += 1
+            return self._restart_failure_count
+
+    def _reset_restart_failures(self) -> int:
+        """重启失败计数清零，返回清零前的计数"""
+        with self._failure_lock:
+            old_count = self._restart_failure_count
+            self._restart_failure_count = 0
+            return old_count
+
+    def _restart_interrupted(self, seconds: float) -> bool:
+        """重启步骤之间的等待，收到停止信号时立即返回 True"""
+        if self._stop_event.wait(timeout=seconds):
+            logging.info("收到停止信号，中止重启策略")
+            return True
+        return False
+
+    def _wait_until(self, predicate, max_wait: float = 5.0, base: float = 0.1,
+                    cancel: Optional[threading.Event] = None) -> bool:
+        """轮询等待状态就绪，间隔按 1.3 倍递增；就绪返回 True，超时或 cancel 被设置时返回 False
+        
+        cancel 仅由后台自动治愈路径传入 _stop_event：交互式重启不能依赖该事件，
+        stop_auto_heal 之后它一直保持设置状态。
+        """
+        if cancel is None:
+            cancel = threading.Event()  # 从不设置，仅用于可中断的等待
+        deadline = _now() + max_wait
+        interval = base
+        while True:
+            try:
+                if predicate():
+                    return True
+            except Exception as e:
+                logging.debug("就绪检查异常: %s", e)
+            remaining = deadline - _now()
+            if remaining <= 0:
+                return False
+            if cancel.wait(timeout=min(interval, remaining)):
+                return False
+            interval *= 1.3
+
+    def _app_stopped(self) -> bool:
+        return get_app_status() != "running"
+
+    def _service_stopped(self) -> bool:
+        return get_service_status(self.config) != "running"
+
+    def _service_running(self) -> bool:
+        return get_service_status(self.config) == "running"
+
     def _silent_restart_strategy(self):
-        """执行重启策略（静默版本，用于后台线程）"""
+        """执行重启策略（静默版本，用于后台线程）
+        
+        步骤之间按实际状态轮询等待（而非固定休眠），并响应停止信号：
+        自动治愈被停止时立即中止并返回 False（不计入失败次数）。
+        """
         logging.info("开始执行重启策略：停止应用 -> 停止服务 -> 启动服务 -> 启动应用")
         
-        self._last_restart_time = time.time()
+        self._last_restart_time = _now()
         restart_success = False
         
         try:
             # 停止应用和服务
             self._silent_stop_zerotier_app()
-            time.sleep(1)
+            self._wait_until(self._app_stopped, cancel=self._stop_event)
+            if self._restart_interrupted(0):
+                return False
             self._silent_stop_zerotier_service()
             
-            # 等待一段时间
-            time.sleep(2)
+            # 等待服务真正停止
+            self._wait_until(self._service_stopped, cancel=self._stop_event)
+            if self._restart_interrupted(0):
+                return False
             
-            # 启动服务和应用
+            # 启动服务，等待就绪后再启动应用
             service_ok = self._silent_start_zerotier_service()
-            time.sleep(3)
+            self._wait_until(self._service_running, cancel=self._stop_event)
+            if self._restart_interrupted(0):
+                return False
             app_ok = self._silent_start_zerotier_app()
             
             # 检查重启是否成功
             restart_success = service_ok and app_ok
             
             if restart_success:
-                self._restart_failure_count = 0  # 重置失败计数
+                self._reset_restart_failures()  # 重置失败计数
                 logging.info("重启策略执行成功")
             else:
-                self._restart_failure_count += 1
-                logging.warning(f"重启策略可能失败，连续失败次数: {self._restart_failure_count}")
+                failures = self._record_restart_failure()
+                logging.warning(f"重启策略可能失败，连续失败次数: {failures}")
                 
         except Exception as e:
-            self._restart_failure_count += 1
-            logging.error(f"重启策略执行异常: {e}，连续失败次数: {self._restart_failure_count}")
+            failures = self._record_restart_failure()
+            logging.error(f"重启策略执行异常: {e}，连续失败次数: {failures}")
             
         return restart_success
 
     def restart_strategy(self):
         """执行重启策略 - 增强失败跟踪和退避"""
         message = "执行重启策略：停止应用 -> 停止服务 -> 启动服务 -> 启动应用"
-        print(Fore.CYAN + message)
+        print(f"{Fore.CYAN}{message}")
         logging.info("开始执行重启策略")
         
-        self._last_restart_time = time.time()
+        self._last_restart_time = _now()
         restart_success = False
         
         try:
             # 停止应用和服务
             self.stop_zerotier_app()
-            time.sleep(1)
+            self._wait_until(self._app_stopped)
             self.stop_zerotier_service()
             
-            # 等待一段时间
-            time.sleep(2)
+            # 等待服务真正停止
+            self._wait_until(self._service_stopped)
             
-            # 启动服务和应用
+            # 启动服务，等待就绪后再启动应用
             service_ok = self.start_zerotier_service()
-            time.sleep(3)
+            self._wait_until(self._service_running)
             app_ok = self.start_zerotier_app()
             
             # 检查重启是否成功
             restart_success = service_ok and app_ok
             
             if restart_success:
-                self._restart_failure_count = 0  # 重置失败计数
+                self._reset_restart_failures()  # 重置失败计数
                 logging.info("重启策略执行成功")
             else:
-                self._restart_failure_count += 1
-                logging.warning(f"重启策略可能失败，连续失败次数: {self._restart_failure_count}")
+                failures = self._record_restart_failure()
+                logging.warning(f"重启策略可能失败，连续失败次数: {failures}")
                 
         except Exception as e:
-            self._restart_failure_count += 1
-            logging.error(f"重启策略执行异常: {e}，连续失败次数: {self._restart_failure_count}")
+            failures = self._record_restart_failure()
+            logging.error(f"重启策略执行异常: {e}，连续失败次数: {failures}")
             
         return restart_success
 
+    def _refill_restart_token(self):
+        """ping 成功时补充重启令牌（不超过桶容量）"""
+        self._restart_tokens = min(RESTART_TOKEN_MAX, self._restart_tokens + RESTART_TOKEN_REFILL)
+
+    def _take_restart_token(self) -> bool:
+        """从重启令牌桶中取一个令牌，令牌不足时返回 False
+        
+        除 ping 成功补充外，还按时间缓慢补充（每 RESTART_TOKEN_REFILL_COOLDOWNS 个冷却期一个）：
+        需要重启的恰好是本机 ZeroTier 时 ping 永远不会成功，不能让自动治愈永久停摆。
+        """
+        now = _now()
+        refill_period = max(10, self.config.restart_cooldown_sec) * RESTART_TOKEN_REFILL_COOLDOWNS
+        self._restart_tokens = min(RESTART_TOKEN_MAX,
+                                   self._restart_tokens + (now - self._restart_tokens_at) / refill_period)
+        self._restart_tokens_at = now
+        if self._restart_tokens < 1.0:
+            if not self._restart_tokens_exhausted:
+                logging.warning(f"重启令牌已耗尽 ({self._restart_tokens:.1f}/{RESTART_TOKEN_MAX:.0f})，"
+                                f"暂停重启，等待网络恢复或随时间补充")
+                self._restart_tokens_exhausted = True
+            return False
+        self._restart_tokens -= 1.0
+        self._restart_tokens_exhausted = False
+        return True
+
     # ---- 自动化功能 ----
+    def _wait_next_check(self, ping_interval: int, consecutive_successes: int, started_at: float) -> bool:
+        """等待下一轮检测，收到停止信号时返回 True
+        
+        到达间隔或被 kick() 唤醒时继续；网络持续稳定时逐步放宽检测间隔
+        （不超过上限，且不小于配置的基础间隔）。间隔从本轮开始时刻 started_at 起算，
+        扣除本轮 ping/重启已花费的时间，避免检测节奏漂移；本轮已超时则立即进入下一轮。
+        """
+        base_interval = max(5, ping_interval)
+        wait_time = max(base_interval, min(
+            MAX_ADAPTIVE_PING_INTERVAL_SEC,
+            base_interval * (1 + consecutive_successes // ADAPTIVE_PING_STEP)
+        ))
+        remaining = started_at + wait_time - _now()
+        if remaining > 0:
+            self._wake_event.wait(timeout=remaining)
+        self._wake_event.clear()
+        return self._stop_event.is_set()
+
     def auto_heal_loop(self):
-        """自动治愈循环 - 修复版本，解决卡死和失败计数问题"""
         """自动治愈循环 - 修复版本，解决卡死和失败计数问题"""
         cooldown_until = 0.0
         last_status = None
         consecutive_ping_failures = 0  # 新增：连续ping失败计数
+        consecutive_successes = 0      # 连续ping成功计数，用于自适应放宽检测间隔
         last_ping_time = 0.0           # 新增：上次ping时间
+        steady_target = None           # 已记录为稳定在线的目标 IP（快速路径用）
+        recovery_attempts = 0          # 达到最大失败次数后的网络恢复检测次数
         
         # 增强的状态跟踪
         loop_iteration = 0
-        last_log_time = 0.0
-        consecutive_ping_failures = 0  # 新增：连续ping失败计数
-        last_ping_time = 0.0           # 新增：上次ping时间
-        
-        # 增强的状态跟踪
-        loop_iteration = 0
-        last_log_time = 0.0
+        last_log_time = float('-inf')  # 首轮即输出心跳
         
         while not self._stop_event.is_set():
             try:
-                current_time = time.time()
+                # 每轮开始时取一次时间并快照配置：本轮内读取一致，菜单线程中途修改配置也不会读到一半
+                current_time = _now()
+                cfg = self.config
+                target_ip = cfg.target_ip
+                ping_timeout = cfg.ping_timeout_sec
+                ping_interval = cfg.ping_interval_sec
                 loop_iteration += 1
                 
                 # 每隔5分钟输出一次心跳日志，证明循环还在运行
                 if current_time - last_log_time >= 300:  # 5分钟
-                    logging.info(f"[自动治愈] 心跳检查 (循环 #{loop_iteration}, 失败次数: {self._restart_failure_count})")
-                    last_log_time = current_time
-                loop_iteration += 1
-                
-                # 每隔5分钟输出一次心跳日志，证明循环还在运行
-                if current_time - last_log_time >= 300:  # 5分钟
-                    logging.info(f"[自动治愈] 心跳检查 (循环 #{loop_iteration}, 失败次数: {self._restart_failure_count})")
+                    logging.info("[自动治愈] 心跳检查 (循环 #%d, 失败次数: %d)", loop_iteration, self._restart_failure_count)
                     last_log_time = current_time
+                    # 顺带轮换超龄的HTTP会话
+                    self._rotate_stale_session()
                 
                 # 检查是否设置了目标 IP
-                if not self.config.target_ip:
+                if not target_ip:
                     if last_status != "no_target":
                         logging.warning("未设置目标 IP，自动治愈暂停")
                         last_status = "no_target"
@@ -1096,22 +1612,23 @@ class ClientApp:
                     if last_status != "max_failures":
                         logging.error(f"连续重启失败 {self._restart_failure_count} 次，暂停自动治愈")
                         last_status = "max_failures"
-                    # 在达到最大失败次数时，使用更长的等待时间，并在网络恢复时重置
-                    if self._stop_event.wait(timeout=NETWORK_RECOVERY_WAIT_SEC):  # 5分钟
+                        recovery_attempts = 0
+                    # 在达到最大失败次数时，使用更长的等待时间，并在网络恢复时重置：
+                    # 每次检测未恢复则等待时间翻倍（有上限），再加随机抖动错开各客户端的探测
+                    recovery_wait = (
+                        NETWORK_RECOVERY_WAIT_SEC * 2 ** min(recovery_attempts, MAX_RECOVERY_BACKOFF_EXPONENT)
+                        + random.uniform(0, NETWORK_RECOVERY_WAIT_SEC)
+                    )
+                    recovery_attempts += 1
+                    logging.debug("等待 %.0fs 后检测网络是否恢复 (第 %d 次)", recovery_wait, recovery_attempts)
+                    if self._stop_event.wait(timeout=recovery_wait):
                         break
                     # 等待后重新检测网络状态，如果恢复则重置失败计数
                     try:
-                        if ping(self.config.target_ip, self.config.ping_timeout_sec):
-                            logging.info("网络已恢复，重置重启失败计数")
-                            self._restart_failure_count = 0
-                            consecutive_ping_failures = 0  # 同时重置ping失败计数
-                            last_status = None  # 重置状态以触发新的状态消息
-                    except Exception as ping_error:
-                        logging.warning(f"网络恢复检测时出错: {ping_error}")
-                    try:
-                        if ping(self.config.target_ip, self.config.ping_timeout_sec):
+                        # 等待了较长时间，重新读取配置以使用最新的目标 IP
+                        if fast_ping(self.config.target_ip, self.config.ping_timeout_sec, cancel=self._stop_event):
                             logging.info("网络已恢复，重置重启失败计数")
-                            self._restart_failure_count = 0
+                            self._reset_restart_failures()
                             consecutive_ping_failures = 0  # 同时重置ping失败计数
                             last_status = None  # 重置状态以触发新的状态消息
                     except Exception as ping_error:
@@ -1120,104 +1637,106 @@ class ClientApp:
                 
                 # Ping 目标主机（增加异常处理）
                 try:
-                    reachable = ping(self.config.target_ip, self.config.ping_timeout_sec)
-                    last_ping_time = current_time
-                except Exception as ping_error:
-                    logging.warning(f"Ping执行出错: {ping_error}")
-                    reachable = False
-                    
-                # Ping 目标主机（增加异常处理）
-                try:
-                    reachable = ping(self.config.target_ip, self.config.ping_timeout_sec)
+                    reachable = fast_ping(target_ip, ping_timeout, cancel=self._stop_event)
                     last_ping_time = current_time
                 except Exception as ping_error:
                     logging.warning(f"Ping执行出错: {ping_error}")
                     reachable = False
+                
+                # 快速路径：目标持续在线且没有任何失败计数时，只更新计数后直接等待，
+                # 跳过状态消息构建、日志判断和重启判断；状态变化时才走完整诊断路径
+                if (reachable and steady_target == target_ip and not self._remember_pending and
+                        consecutive_ping_failures == 0 and self._restart_failure_count == 0):
+                    consecutive_successes += 1
+                    self._refill_restart_token()
+                    if self._wait_next_check(ping_interval, consecutive_successes, current_time):
+                        break
+                    continue
                     
-                status_msg = f"ping {self.config.target_ip}: {'成功' if reachable else '失败'}"
+                # 状态键用于比较是否变化，日志消息只在需要输出时才格式化
+                status_key = (target_ip, reachable)
                 
                 # 更新ping失败计数
                 if reachable:
-                    if consecutive_ping_failures > 0:
-                        logging.info(f"Ping恢复成功，重置连续失败计数 ({consecutive_ping_failures} -> 0)")
+                    if consecutive_ping_failures > 0 and self._status_log_limiter.allow('ping_recovered') is not None:
+                        logging.info("Ping恢复成功，重置连续失败计数 (%d -> 0)", consecutive_ping_failures)
                     consecutive_ping_failures = 0
+                    consecutive_successes += 1
+                    self._refill_restart_token()
                     # 网络恢复时重置重启失败计数
                     if self._restart_failure_count > 0:
-                # 更新ping失败计数
-                if reachable:
-                    if consecutive_ping_failures > 0:
-                        logging.info(f"Ping恢复成功，重置连续失败计数 ({consecutive_ping_failures} -> 0)")
-                    consecutive_ping_failures = 0
-                    # 网络恢复时重置重启失败计数
-                    if self._restart_failure_count > 0:
-                        logging.info(f"网络已恢复，重置重启失败计数 ({self._restart_failure_count} -> 0)")
-                        self._restart_failure_count = 0
-                else:
-                    consecutive_ping_failures += 1
-                
-                # 减少日志噪声：只在状态变化或每10次ping失败时记录
-                should_log_status = (
-                    last_status != status_msg or
-                    (not reachable and consecutive_ping_failures % 10 == 0)
-                )
-                
-                if should_log_status:
-                    if not reachable and consecutive_ping_failures > 1:
-                        logging.info(f"[自动治愈] {status_msg} (连续失败 {consecutive_ping_failures} 次)")
-                    else:
-                        logging.info(f"[自动治愈] {status_msg}")
+                        old_count = self._reset_restart_failures()
+                        logging.info("网络已恢复，重置重启失败计数 (%d -> 0)", old_count)
+                    # 重启后未能完成的上报：退避期满且熔断器放行时重试
+                    if self._remember_pending and self._remember_retry_allow():
+                        if self._silent_remember_self():
+                            logging.info("补报本机 IP 成功")
                 else:
                     consecutive_ping_failures += 1
+                    consecutive_successes = 0  # 一旦失败立即恢复到基础检测间隔
                 
                 # 减少日志噪声：只在状态变化或每10次ping失败时记录
                 should_log_status = (
-                    last_status != status_msg or
+                    last_status != status_key or
                     (not reachable and consecutive_ping_failures % 10 == 0)
                 )
                 
                 if should_log_status:
-                    if not reachable and consecutive_ping_failures > 1:
-                        logging.info(f"[自动治愈] {status_msg} (连续失败 {consecutive_ping_failures} 次)")
-                    else:
-                        logging.info(f"[自动治愈] {status_msg}")
-                    last_status = status_msg
+                    # 网络反复抖动时限制输出频率，避免日志写入放大
+                    suppressed = self._status_log_limiter.allow('ping_status')
+                    if suppressed is not None:
+                        if suppressed:
+                            logging.info("[自动治愈] 网络状态频繁变化，已省略 %d 条状态日志", suppressed)
+                        result_text = '成功' if reachable else '失败'
+                        if not reachable and consecutive_ping_failures > 1:
+                            logging.info("[自动治愈] ping %s: %s (连续失败 %d 次)",
+                                         target_ip, result_text, consecutive_ping_failures)
+                        else:
+                            logging.info("[自动治愈] ping %s: %s", target_ip, result_text)
+                    last_status = status_key
+                steady_target = target_ip if reachable else None
                 
                 # 如果不可达且已过冷却期，执行重启策略
                 # 增加条件：必须连续ping失败超过3次才触发重启，避免偶发网络波动
+                # 本机没有任何已连接的网络链路（如合盖、关闭 Wi-Fi）时，重启 ZeroTier 无济于事，推迟重启
+                if (not reachable and
+                        consecutive_ping_failures >= 3 and
+                        current_time >= cooldown_until and
+                        not local_link_up(cfg)):
+                    logging.warning("本机网络链路未连接，推迟重启")
+                    cooldown_until = current_time + max(5, ping_interval) * 2
+                
+                # 最后检查令牌桶：令牌耗尽时跳过重启，等待网络恢复补充令牌
                 if (not reachable and 
                     consecutive_ping_failures >= 3 and 
-                    current_time >= cooldown_until):
-                    
-                # 增加条件：必须连续ping失败超过3次才触发重启，避免偶发网络波动
-                if (not reachable and 
-                    consecutive_ping_failures >= 3 and 
-                    current_time >= cooldown_until):
+                    current_time >= cooldown_until and
+                    self._take_restart_token()):
                     
                     # 计算动态冷却期（安全的指数退避实现）
-                    base_cooldown = max(10, self.config.restart_cooldown_sec)
+                    base_cooldown = max(10, cfg.restart_cooldown_sec)
                     
                     # 限制指数以防止整数溢出，降低最大指数避免过长间隔
                     safe_exponent = min(MAX_BACKOFF_EXPONENT, self._restart_failure_count)
                     exponential_multiplier = min(16, 2 ** safe_exponent)  # 最大16倍（2^4）
-                    exponential_backoff = min(MAX_BACKOFF_TIME_SEC, base_cooldown * exponential_multiplier)
+                    backoff_cap = min(MAX_BACKOFF_TIME_SEC, base_cooldown * exponential_multiplier)
+                    # 随机抖动：在 [基础冷却, 上限] 内均匀取值，避免大量客户端在同一时刻集中重启
+                    exponential_backoff = random.uniform(base_cooldown, backoff_cap)
                     
-                    logging.warning(f"目标主机 {self.config.target_ip} 连续 {consecutive_ping_failures} 次不可达，执行重启策略 "
-                                  f"(重启失败次数: {self._restart_failure_count}, 指数: {safe_exponent}, "
-                    logging.warning(f"目标主机 {self.config.target_ip} 连续 {consecutive_ping_failures} 次不可达，执行重启策略 "
-                                  f"(重启失败次数: {self._restart_failure_count}, 指数: {safe_exponent}, "
-                                  f"退避: {exponential_backoff}s)")
+                    logging.warning("目标主机 %s 连续 %d 次不可达，执行重启策略 "
+                                    "(重启失败次数: %d, 指数: %d, 退避: %.1fs, 上限: %ss)",
+                                    target_ip, consecutive_ping_failures, self._restart_failure_count,
+                                    safe_exponent, exponential_backoff, backoff_cap)
                     
                     restart_success = False
                     try:
                         restart_success = self._silent_restart_strategy()
                     except Exception as restart_error:
                         logging.error(f"重启策略执行异常: {restart_error}")
-                        self._restart_failure_count += 1
+                        self._record_restart_failure()
                     
                     # 设置冷却期（使用当前时间 + 退避时间，考虑重启耗时）
-                    cooldown_until = time.time() + exponential_backoff
+                    cooldown_until = _now() + exponential_backoff
                     
-                    # 重启后尝试上报本机 IP（增加超时保护）
                     # 重启后尝试上报本机 IP（增加超时保护）
                     if self._stop_event.wait(timeout=5):
                         break
@@ -1228,15 +1747,14 @@ class ClientApp:
                             if self._stop_event.wait(timeout=10):
                                 break
                             # 重启成功后尝试上报（静默模式，避免后台线程输出到控制台）
-                            if self._silent_remember_self():
+                            if self._silent_remember_self(force=True):
                                 logging.info("重启后成功上报本机 IP")
                                 consecutive_ping_failures = 0  # 重启成功后重置ping失败计数
                         except Exception as report_error:
                             logging.warning(f"重启后上报IP失败: {report_error}")
                 
-                # 等待下次检查，使用 Event.wait 响应停止信号
-                wait_time = max(5, self.config.ping_interval_sec)
-                if self._stop_event.wait(timeout=wait_time):
+                # 等待下次检查
+                if self._wait_next_check(ping_interval, consecutive_successes, current_time):
                     break
                 
             except Exception as e:
@@ -1246,29 +1764,28 @@ class ClientApp:
                     break
         
         logging.info("自动治愈循环已退出")
-        
-        logging.info("自动治愈循环已退出")
 
     def start_auto_heal(self):
         """启动自动治愈"""
         if not self.config.auto_heal_enabled:
             message = "自动治愈已在配置中禁用"
-            print(Fore.YELLOW + message)
+            print(f"{Fore.YELLOW}{message}")
             logging.warning(message)
             return
         
         if self._bg_thread and self._bg_thread.is_alive():
             message = "自动治愈已在运行"
-            print(Fore.YELLOW + message)
+            print(f"{Fore.YELLOW}{message}")
             logging.warning(message)
             return
         
         self._stop_event.clear()
+        self._wake_event.clear()
         self._bg_thread = threading.Thread(target=self.auto_heal_loop, daemon=True)
         self._bg_thread.start()
         
         message = "自动治愈已启动"
-        print(Fore.GREEN + message)
+        print(f"{Fore.GREEN}{message}")
         logging.info(message)
 
     def reset_failure_count(self):
@@ -1279,74 +1796,53 @@ class ClientApp:
         
         if self._restart_failure_count == 0:
             message = "失败计数已经为0，无需重置"
-            print(Fore.YELLOW + message)
+            print(f"{Fore.YELLOW}{message}")
             logging.info(message)
             return
         
         confirm = input("确认重置失败计数？ (y/N): ").strip().lower()
         if confirm != 'y':
-            print(Fore.YELLOW + "已取消重置操作")
+            print(f"{Fore.YELLOW}已取消重置操作")
             return
         
-        old_count = self._restart_failure_count
-        self._restart_failure_count = 0
+        old_count = self._reset_restart_failures()
         
         message = f"已重置失败计数: {old_count} -> 0"
-        print(Fore.GREEN + message)
+        print(f"{Fore.GREEN}{message}")
         logging.info(f"用户手动重置自动治愈失败计数: {old_count} -> 0")
         
         # 如果自动治愈正在运行，提示用户
         if self._bg_thread and self._bg_thread.is_alive():
-            print(Fore.GREEN + "自动治愈将继续正常工作")
+            print(f"{Fore.GREEN}自动治愈将继续正常工作")
         else:
-            print(Fore.YELLOW + "请启动自动治愈以使重置生效 (选项14)")
+            print(f"{Fore.YELLOW}请启动自动治愈以使重置生效 (选项14)")
 
-    def reset_failure_count(self):
-        """重置自动治愈失败计数"""
-        print("—— 重置自动治愈失败计数 ——")
-        print(f"当前失败计数: {self._restart_failure_count}")
-        print(f"最大允许失败: {self._max_restart_failures}")
-        
-        if self._restart_failure_count == 0:
-            message = "失败计数已经为0，无需重置"
-            print(Fore.YELLOW + message)
-            logging.info(message)
-            return
-        
-        confirm = input("确认重置失败计数？ (y/N): ").strip().lower()
-        if confirm != 'y':
-            print(Fore.YELLOW + "已取消重置操作")
-            return
-        
-        old_count = self._restart_failure_count
-        self._restart_failure_count = 0
-        
-        message = f"已重置失败计数: {old_count} -> 0"
-        print(Fore.GREEN + message)
-        logging.info(f"用户手动重置自动治愈失败计数: {old_count} -> 0")
-        
-        # 如果自动治愈正在运行，提示用户
-        if self._bg_thread and self._bg_thread.is_alive():
-            print(Fore.GREEN + "自动治愈将继续正常工作")
-        else:
-            print(Fore.YELLOW + "请启动自动治愈以使重置生效 (选项14)")
+    def kick(self):
+        """唤醒自动治愈循环，跳过剩余等待立即执行一次检测（未运行时无副作用）"""
+        self._wake_event.set()
 
     def stop_auto_heal(self):
         """停止自动治愈"""
         self._stop_event.set()
+        self._wake_event.set()
         if self._bg_thread:
-            # 延长等待时间，确保线程能响应 Event 信号
-            self._bg_thread.join(timeout=10)
+            # 等待中的线程会被 Event 立即唤醒；正在 ping 的线程则终止其子进程，
+            # 探测看到停止信号后不再启动新的 ping。等待上限覆盖极端情况：
+            # 检查停止信号后恰好启动的 ping 子进程（最长 ping 超时 + 2 秒）加 TCP 探测
+            if self._bg_thread.is_alive():
+                terminate_active_pings()
+            self._bg_thread.join(timeout=self.config.ping_timeout_sec + 3)
             if self._bg_thread.is_alive():
                 logging.warning("自动治愈线程未能及时停止")
         
         message = "自动治愈已停止"
-        print(Fore.GREEN + message)
+        print(f"{Fore.GREEN}{message}")
         logging.info(message)
 
     def cleanup(self):
         """清理资源"""
         self.stop_auto_heal()
+        self._status_pool.shutdown(wait=False)
         self._cleanup_session()
 
     def debug_auto_heal(self):
@@ -1371,116 +1867,38 @@ class ClientApp:
         # 失败计数器状态
         print(f"重启失败计数: {self._restart_failure_count}/{self._max_restart_failures}")
         if self._restart_failure_count >= self._max_restart_failures:
-            print(Fore.RED + "  ⚠️ 已达到最大失败次数，自动治愈已暂停")
+            print(f"{Fore.RED}  ⚠️ 已达到最大失败次数，自动治愈已暂停")
+        print(f"重启令牌: {self._restart_tokens:.1f}/{RESTART_TOKEN_MAX:.0f}")
+        if self._restart_tokens < 1.0:
+            print(f"{Fore.YELLOW}  ⚠️ 重启令牌已耗尽，网络恢复前不会执行重启")
         
         # 配置检查
         print(f"目标IP设置: {self.config.target_ip or '未设置'}")
         if not self.config.target_ip:
-            print(Fore.YELLOW + "  ⚠️ 未设置目标IP，自动治愈无法工作")
+            print(f"{Fore.YELLOW}  ⚠️ 未设置目标IP，自动治愈无法工作")
         
         print(f"Ping间隔: {self.config.ping_interval_sec} 秒")
         print(f"Ping超时: {self.config.ping_timeout_sec} 秒")
         print(f"重启冷却: {self.config.restart_cooldown_sec} 秒")
         
-        # 网络连通性测试
-        if self.config.target_ip:
-            print(f"\n正在测试目标主机连通性...")
-            try:
-                start_time = time.time()
-                reachable = ping(self.config.target_ip, self.config.ping_timeout_sec)
-                ping_time = (time.time() - start_time) * 1000
-                
-                if reachable:
-                    print(f"{Fore.GREEN}✓ 目标主机可达 (用时: {ping_time:.1f}ms)")
-                else:
-                    print(f"{Fore.RED}✗ 目标主机不可达 (用时: {ping_time:.1f}ms)")
-                    print("  这可能是自动治愈停止工作的原因")
-            except Exception as e:
-                print(f"{Fore.RED}✗ Ping测试异常: {e}")
-        
-        # 服务端连接测试
-        print(f"\n正在测试服务端连接...")
-        try:
-            start_time = time.time()
-            health_ok = self.check_server_health(silent=True)
-            api_time = (time.time() - start_time) * 1000
-            
-            if health_ok:
-                print(f"{Fore.GREEN}✓ 服务端连接正常 (用时: {api_time:.1f}ms)")
-            else:
-                print(f"{Fore.RED}✗ 服务端连接失败 (用时: {api_time:.1f}ms)")
-        except Exception as e:
-            print(f"{Fore.RED}✗ 服务端测试异常: {e}")
-        
-        # HTTP会话状态
-        with self._session_lock:
-            if self._session:
-                session_age = time.time() - self._session_created_at
-                print(f"\nHTTP会话状态: 正常")
-                print(f"  会话存活时间: {session_age:.0f} 秒")
-                print(f"  已处理请求: {self._session_request_count}")
-                print(f"  最大请求数: {self._session_max_requests}")
-                print(f"  最大存活时间: {self._session_max_age} 秒")
-            else:
-                print(f"\n{Fore.YELLOW}HTTP会话状态: 未初始化")
-        
-        # 建议和排查步骤
-        print(f"\n{Fore.CYAN}排查建议:")
-        if not self.config.auto_heal_enabled:
-            print(f"  1. 自动治愈在配置中被禁用，请检查配置")
-        if not self.config.target_ip:
-            print(f"  2. 请先设置目标IP (选项1)")
-        if not is_running and self.config.auto_heal_enabled and self.config.target_ip:
-            print(f"  3. 尝试重新启动自动治愈 (选项14)")
-        if self._restart_failure_count >= self._max_restart_failures:
-            print(f"  4. 重启失败次数过多，等待网络恢复或手动重置失败计数")
-            print(f"     可以尝试停止后重新启动自动治愈来重置计数")
-        
-        print(f"  5. 检查日志文件: {self.config.log_file}")
-        print(f"  6. 确保ZeroTier服务正常运行")
+        # 目标主机和服务端的连通性测试并发执行，各自计时
+        def timed(func, *args):
+            start_time = time.monotonic()
+            result = func(*args)
+            return result, (time.monotonic() - start_time) * 1000
         
-        logging.info("用户查看自动治愈调试信息")
-
-    def debug_auto_heal(self):
-        """调试自动治愈状态 - 详细诊断信息"""
-        print("—— 自动治愈调试信息 ——")
-        
-        # 基本状态
-        is_running = self._bg_thread and self._bg_thread.is_alive()
-        print(f"自动治愈状态: {'运行中' if is_running else '已停止'}")
-        print(f"配置启用状态: {'启用' if self.config.auto_heal_enabled else '禁用'}")
-        
-        if self._bg_thread:
-            print(f"后台线程ID: {self._bg_thread.ident}")
-            print(f"线程存活状态: {self._bg_thread.is_alive()}")
-            print(f"线程是否为守护线程: {self._bg_thread.daemon}")
-        else:
-            print("后台线程: 未创建")
-        
-        # 停止事件状态
-        print(f"停止信号状态: {'已设置' if self._stop_event.is_set() else '未设置'}")
-        
-        # 失败计数器状态
-        print(f"重启失败计数: {self._restart_failure_count}/{self._max_restart_failures}")
-        if self._restart_failure_count >= self._max_restart_failures:
-            print(Fore.RED + "  ⚠️ 已达到最大失败次数，自动治愈已暂停")
-        
-        # 配置检查
-        print(f"目标IP设置: {self.config.target_ip or '未设置'}")
-        if not self.config.target_ip:
-            print(Fore.YELLOW + "  ⚠️ 未设置目标IP，自动治愈无法工作")
-        
-        print(f"Ping间隔: {self.config.ping_interval_sec} 秒")
-        print(f"Ping超时: {self.config.ping_timeout_sec} 秒")
-        print(f"重启冷却: {self.config.restart_cooldown_sec} 秒")
+        ping_future = None
+        if self.config.target_ip:
+            ping_future = self._status_pool.submit(
+                timed, fast_ping, self.config.target_ip, self.config.ping_timeout_sec
+            )
+        health_future = self._status_pool.submit(timed, self.check_server_health, True)
         
         # 网络连通性测试
-        if self.config.target_ip:
+        if ping_future is not None:
             print(f"\n正在测试目标主机连通性...")
             try:
-                start_time = time.time()
-                reachable = ping(self.config.target_ip, self.config.ping_timeout_sec)
-                ping_time = (time.time() - start_time) * 1000
+                reachable, ping_time = ping_future.result()
                 
                 if reachable:
                     print(f"{Fore.GREEN}✓ 目标主机可达 (用时: {ping_time:.1f}ms)")
@@ -1493,9 +1911,7 @@ class ClientApp:
         # 服务端连接测试
         print(f"\n正在测试服务端连接...")
         try:
-            start_time = time.time()
-            health_ok = self.check_server_health(silent=True)
-            api_time = (time.time() - start_time) * 1000
+            health_ok, api_time = health_future.result()
             
             if health_ok:
                 print(f"{Fore.GREEN}✓ 服务端连接正常 (用时: {api_time:.1f}ms)")
@@ -1507,11 +1923,9 @@ class ClientApp:
         # HTTP会话状态
         with self._session_lock:
             if self._session:
-                session_age = time.time() - self._session_created_at
+                session_age = time.monotonic() - self._session_created_at
                 print(f"\nHTTP会话状态: 正常")
                 print(f"  会话存活时间: {session_age:.0f} 秒")
-                print(f"  已处理请求: {self._session_request_count}")
-                print(f"  最大请求数: {self._session_max_requests}")
                 print(f"  最大存活时间: {self._session_max_age} 秒")
             else:
                 print(f"\n{Fore.YELLOW}HTTP会话状态: 未初始化")
@@ -1538,23 +1952,23 @@ class ClientApp:
         """显示系统状态"""
         print("—— 系统状态 ——")
         
+        # 各项探测互不依赖，先全部提交再按顺序输出结果
+        pool = self._status_pool
+        service_future = pool.submit(self._cached, 'service_status', 5, get_service_status, self.config)
+        app_future = pool.submit(get_app_status)
+        ips_future = pool.submit(self._cached, 'zerotier_ips', 10, get_zerotier_ips, self.config)
+        ping_future = None
+        if self.config.target_ip:
+            ping_future = pool.submit(fast_ping, self.config.target_ip, self.config.ping_timeout_sec)
+        
         # ZeroTier 状态
-        service_status = get_service_status(self.config)
-        app_status = get_app_status()
-        print(f"ZeroTier 服务: {service_status}")
-        print(f"ZeroTier 应用: {app_status}")
+        print(f"ZeroTier 服务: {service_future.result()}")
+        print(f"ZeroTier 应用: {app_future.result()}")
         
         # 网络状态
-        if self.config.target_ip:
+        if ping_future is not None:
             try:
-                reachable = ping(self.config.target_ip, self.config.ping_timeout_sec)
-                status_color = Fore.GREEN if reachable else Fore.RED
-                status_text = "可达" if reachable else "不可达"
-                print(f"目标主机 ({self.config.target_ip}): {status_color}{status_text}")
-            except Exception as e:
-                print(f"目标主机 ({self.config.target_ip}): {Fore.YELLOW}检测异常 ({e})")
-            try:
-                reachable = ping(self.config.target_ip, self.config.ping_timeout_sec)
+                reachable = ping_future.result()
                 status_color = Fore.GREEN if reachable else Fore.RED
                 status_text = "可达" if reachable else "不可达"
                 print(f"目标主机 ({self.config.target_ip}): {status_color}{status_text}")
@@ -1564,13 +1978,12 @@ class ClientApp:
             print("目标主机: 未设置")
         
         # 本机 IP
-        local_ips = get_zerotier_ips(self.config)
+        local_ips = ips_future.result()
         if local_ips:
             print(f"本机 ZeroTier IP: {', '.join(local_ips)}")
         else:
             print("本机 ZeroTier IP: 未找到")
         
-        # 自动化状态（增强诊断信息）
         # 自动化状态（增强诊断信息）
         auto_status = "运行中" if (self._bg_thread and self._bg_thread.is_alive()) else "已停止"
         print(f"自动治愈: {auto_status}")
@@ -1589,27 +2002,8 @@ class ClientApp:
         # HTTP会话状态
         with self._session_lock:
             if self._session:
-                session_age = time.time() - self._session_created_at
-                print(f"HTTP会话: 正常 (存活: {session_age:.0f}s, 请求数: {self._session_request_count})")
-            else:
-                print("HTTP会话: 未初始化")
-        
-        if auto_status == "运行中":
-            print(f"  - 重启失败次数: {self._restart_failure_count}/{self._max_restart_failures}")
-            print(f"  - 配置启用状态: {'启用' if self.config.auto_heal_enabled else '禁用'}")
-            print(f"  - Ping 间隔: {self.config.ping_interval_sec} 秒")
-            print(f"  - 重启冷却: {self.config.restart_cooldown_sec} 秒")
-            
-            # 显示线程状态
-            if self._bg_thread:
-                print(f"  - 线程状态: {'活跃' if self._bg_thread.is_alive() else '已终止'}")
-                print(f"  - 线程ID: {self._bg_thread.ident}")
-        
-        # HTTP会话状态
-        with self._session_lock:
-            if self._session:
-                session_age = time.time() - self._session_created_at
-                print(f"HTTP会话: 正常 (存活: {session_age:.0f}s, 请求数: {self._session_request_count})")
+                session_age = time.monotonic() - self._session_created_at
+                print(f"HTTP会话: 正常 (存活: {session_age:.0f}s)")
             else:
                 print("HTTP会话: 未初始化")
         
@@ -1626,20 +2020,31 @@ class ClientApp:
         """显示服务端状态"""
         print("—— 服务端状态 ——")
         
-        # 健康检查
-        health_ok = self.check_server_health()
-        if not health_ok:
+        # 健康检查、统计信息、配置信息并发获取
+        results = self.refresh_all()
+        health = results['health']
+        if health is None:
+            print(f"{Fore.RED}服务端健康检查失败，无法获取服务端状态")
             return
+        clients_info = health.get('clients', {})
+        total = clients_info.get('total', 0) if isinstance(clients_info, dict) else clients_info
+        print(f"{Fore.GREEN}服务端正常，客户端数量: {total}")
         
         print()
         
-        # 获取统计信息
-        self.get_server_stats()
+        # 统计信息
+        if results['stats'] is not None:
+            self._print_server_stats(results['stats'])
+        else:
+            print(f"{Fore.RED}获取统计信息失败")
         
         print()
         
-        # 获取配置信息
-        self.get_server_config()
+        # 配置信息
+        if results['config'] is not None:
+            self._print_server_config(results['config'])
+        else:
+            print(f"{Fore.RED}获取服务端配置失败")
         
         logging.info("用户查看服务端状态")
 
@@ -1647,121 +2052,14 @@ class ClientApp:
     def menu(self):
         """主菜单"""
         while True:
-            print("\n" + "="*50)
-            print(Fore.CYAN + Style.BRIGHT + "ZeroTier Reconnecter 客户端")
-            print("="*50)
-            
-            print("配置管理:")
-            print("  1) 设置服务端设备 ZeroTier IP")
-            print("  2) 高级：手动设置服务端地址")
-            print("  3) 设置服务端API密钥")
-            print("  4) 查看当前配置")
-            print("  5) 验证配置")
-            print("  6) 配置 ZeroTier 路径")
-            print("  7) 重置配置设置")
-            
-            print("\nZeroTier 管理:")
-            print("  8) 启动 ZeroTier 服务")
-            print("  9) 停止 ZeroTier 服务")
-            print("  10) 启动 ZeroTier 应用")
-            print("  11) 停止 ZeroTier 应用")
-            print("  12) 执行重启策略")
-            
-            print("\n网络功能:")
-            print("  13) 向服务端上报本机 IP")
-            print("  14) 启动自动治愈")
-            print("  15) 停止自动治愈")
-            print("  16) 重置自动治愈失败计数")
-            print("  16) 重置自动治愈失败计数")
-            
-            print("\n服务端交互:")
-            print("  17) 启动本地服务端")
-            print("  18) 检查服务端健康状态")
-            print("  19) 查看服务端客户端列表")
-            print("  20) 查看服务端统计信息")
-            print("  21) 查看服务端配置")
-            print("  22) 查看服务端状态汇总")
-            print("  17) 启动本地服务端")
-            print("  18) 检查服务端健康状态")
-            print("  19) 查看服务端客户端列表")
-            print("  20) 查看服务端统计信息")
-            print("  21) 查看服务端配置")
-            print("  22) 查看服务端状态汇总")
-            
-            print("\n状态查看:")
-            print("  23) 查看本地系统状态")
-            print("  24) 查看网络接口信息")
-            print("  25) 调试自动治愈状态")
-            print("  23) 查看本地系统状态")
-            print("  24) 查看网络接口信息")
-            print("  25) 调试自动治愈状态")
-            
-            print("\n  0) 退出")
+            print(_MENU_TEXT)
             
             choice = input("\n请选择: ").strip()
             
             try:
-                if choice == "1":
-                    self.set_target_ip()
-                elif choice == "2":
-                    self.set_server_base()
-                elif choice == "3":
-                    self.set_api_key()
-                elif choice == "4":
-                    self.view_config()
-                elif choice == "5":
-                    self.validate_config()
-                elif choice == "6":
-                    self.configure_zerotier_paths()
-                elif choice == "7":
-                    self.reset_config()
-                elif choice == "8":
-                    self.start_zerotier_service()
-                elif choice == "9":
-                    self.stop_zerotier_service()
-                elif choice == "10":
-                    self.start_zerotier_app()
-                elif choice == "11":
-                    self.stop_zerotier_app()
-                elif choice == "12":
-                    self.restart_strategy()
-                elif choice == "13":
-                    self.remember_self()
-                elif choice == "14":
-                    self.start_auto_heal()
-                elif choice == "15":
-                    self.stop_auto_heal()
-                elif choice == "16":
-                    self.reset_failure_count()
-                    self.reset_failure_count()
-                elif choice == "17":
-                    self.start_local_server()
-                    self.start_local_server()
-                elif choice == "18":
-                    self.check_server_health()
-                    self.check_server_health()
-                elif choice == "19":
-                    self.get_server_clients()
-                    self.get_server_clients()
-                elif choice == "20":
-                    self.get_server_stats()
-                    self.get_server_stats()
-                elif choice == "21":
-                    self.get_server_config()
-                    self.get_server_config()
-                elif choice == "22":
-                    self.show_server_status()
-                    self.show_server_status()
-                elif choice == "23":
-                    self.show_status()
-                elif choice == "24":
-                    self.show_status()
-                elif choice == "24":
-                    self.show_network_info()
-                elif choice == "25":
-                    self.debug_auto_heal()
-                elif choice == "25":
-                    self.debug_auto_heal()
+                action = self._MENU_ACTIONS.get(choice)
+                if action is not None:
+                    getattr(self, action)()
                 elif choice == "0":
                     message = "正在退出..."
                     print(message)
@@ -1769,21 +2067,20 @@ class ClientApp:
                     break
                 else:
                     message = "无效选项"
-                    print(Fore.YELLOW + message)
+                    print(f"{Fore.YELLOW}{message}")
                     logging.warning(f"用户输入无效选项: {choice}")
             
             except KeyboardInterrupt:
                 message = "\n检测到 Ctrl+C，正在退出..."
-                print(Fore.YELLOW + message)
+                print(f"{Fore.YELLOW}{message}")
                 logging.info("用户通过Ctrl+C退出")
                 break
             except Exception as e:
                 message = f"操作出错: {e}"
-                print(Fore.RED + message)
+                print(f"{Fore.RED}{message}")
                 logging.error(f"菜单操作出错: {e}")
         # 移除重复清理：已在finally块中统一处理
 
-
 def main():
     """主入口 - 使用 try/finally 确保资源清理"""
     app = None
@@ -1793,7 +2090,7 @@ def main():
     except Exception as e:
         logging.error(f"程序启动失败: {e}")
         message = f"程序启动失败: {e}"
-        print(Fore.RED + message)
+        print(f"{Fore.RED}{message}")
     finally:
         # 确保资源清理
         if app:
@@ -2,9 +2,72 @@ import json
 import logging
 import hashlib
 import os
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# orjson 为可选依赖，序列化在 C 中完成；不可用时回退到标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_config(data: dict) -> bytes:
+    """序列化配置为带 2 空格缩进的 UTF-8 JSON（保留非 ASCII 字符）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _content_hash(content: bytes) -> str:
+    """配置内容摘要，仅用于变更检测（BLAKE2b 比 MD5 快，且不受 FIPS 模式禁用 MD5 的影响）"""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+# 合法的日志级别（按详细程度排列，用于校验和错误提示）
+VALID_LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# 路径存在性缓存（模块级，重新加载配置后仍可复用）：键为 (路径, 父目录 mtime_ns)，
+# 安装/卸载 ZeroTier 导致目录内容变化时 mtime 改变，旧条目自然失效
+_PATH_EXISTS_CACHE: Dict[Tuple[str, Optional[int]], bool] = {}
+_PATH_EXISTS_CACHE_MAX = 256
+
+
+def _paths_exist(paths: List[str]) -> Dict[str, bool]:
+    """检查路径是否存在：按父目录分组，缓存未命中的目录只做一次 scandir，而不是对每个路径各 stat 一次"""
+    by_dir: Dict[str, List[str]] = {}
+    for path in paths:
+        by_dir.setdefault(os.path.dirname(path), []).append(path)
+    
+    result = {}
+    for directory, dir_paths in by_dir.items():
+        try:
+            mtime: Optional[int] = os.stat(directory or '.').st_mtime_ns
+        except (OSError, ValueError):
+            mtime = None  # 目录不存在，其中的路径都不存在
+        
+        names = None
+        for path in dir_paths:
+            key = (path, mtime)
+            exists = _PATH_EXISTS_CACHE.get(key)
+            if exists is None:
+                if names is None:
+                    names = set()
+                    if mtime is not None:
+                        try:
+                            with os.scandir(directory or '.') as entries:
+                                names = {os.path.normcase(entry.name) for entry in entries}
+                        except (OSError, ValueError):
+                            pass
+                exists = os.path.normcase(os.path.basename(path)) in names
+                if len(_PATH_EXISTS_CACHE) >= _PATH_EXISTS_CACHE_MAX:
+                    # 简单 FIFO 淘汰：dict 保持插入顺序，删除最早的条目
+                    _PATH_EXISTS_CACHE.pop(next(iter(_PATH_EXISTS_CACHE)))
+                _PATH_EXISTS_CACHE[key] = exists
+            result[path] = exists
+    return result
 
 
 @dataclass
@@ -29,6 +92,10 @@ class ClientConfig:
     restart_cooldown_sec: int = 30     # 重启冷却时间（秒）
     ping_timeout_sec: int = 3          # ping 超时时间（秒）
     
+    # HTTP 连接池配置
+    http_pool_connections: int = 2     # 连接池数量（仅连接单个服务端，每种协议一个即可）
+    http_pool_maxsize: int = 0         # 每个连接池的最大连接数，0 表示自动：max(10, CPU核数×5)
+    
     # 日志配置
     log_level: str = "INFO"            # DEBUG, INFO, WARNING, ERROR  
     log_file: str = "~/.zerotier_reconnecter_client.log"  # 默认日志文件路径
@@ -36,10 +103,6 @@ class ClientConfig:
     # 私有属性：用于检测配置变更
     _config_hash: str = ""
     
-    # 类级别的路径验证缓存（减少重复文件系统调用）
-    _path_cache: Optional[dict] = None
-    _cache_timestamp: float = 0.0
-    _cache_ttl: float = 30.0  # 缓存30秒
     
     def __post_init__(self):
         """初始化默认值"""
@@ -88,47 +151,16 @@ class ClientConfig:
             discovered = discover_zerotier_paths()
             updated = False
             
-            # 更新服务路径（如果发现了新路径）
-            if discovered['service_bin']:
-                new_paths = discovered['service_bin'] + (self.zerotier_bin_paths or [])
-                # 去重但保持发现的路径优先
-                unique_paths = []
-                seen = set()
-                for path in new_paths:
-                    if path not in seen:
-                        unique_paths.append(path)
-                        seen.add(path)
-                
-                if unique_paths != self.zerotier_bin_paths:
-                    self.zerotier_bin_paths = unique_paths
-                    updated = True
-            
-            # 更新GUI路径
-            if discovered['gui_bin']:
-                new_gui_paths = discovered['gui_bin'] + (self.zerotier_gui_paths or [])
-                unique_gui_paths = []
-                seen_gui = set()
-                for path in new_gui_paths:
-                    if path not in seen_gui:
-                        unique_gui_paths.append(path)
-                        seen_gui.add(path)
-                
-                if unique_gui_paths != self.zerotier_gui_paths:
-                    self.zerotier_gui_paths = unique_gui_paths
-                    updated = True
-            
-            # 更新服务名称
-            if discovered['service_names']:
-                new_service_names = discovered['service_names'] + (self.zerotier_service_names or [])
-                unique_service_names = []
-                seen_services = set()
-                for name in new_service_names:
-                    if name not in seen_services:
-                        unique_service_names.append(name)
-                        seen_services.add(name)
-                
-                if unique_service_names != self.zerotier_service_names:
-                    self.zerotier_service_names = unique_service_names
+            # 发现的条目放在前面，与已有配置合并去重（dict.fromkeys 保持首次出现的顺序）
+            for key, attr in (('service_bin', 'zerotier_bin_paths'),
+                              ('gui_bin', 'zerotier_gui_paths'),
+                              ('service_names', 'zerotier_service_names')):
+                if not discovered[key]:
+                    continue
+                current = getattr(self, attr)
+                merged = list(dict.fromkeys(discovered[key] + (current or [])))
+                if merged != current:
+                    setattr(self, attr, merged)
                     updated = True
             
             if updated:
@@ -153,13 +185,14 @@ class ClientConfig:
         config_path = cls.get_config_path()
         if config_path.exists():
             try:
-                with open(config_path, 'r', encoding='utf-8') as f:
+                # 以二进制读取：直接解析和计算哈希，无需先解码再编码
+                with open(config_path, 'rb') as f:
                     content = f.read()
-                    data = json.loads(content)
-                    instance = cls(**data)
-                    # 保存配置文件的哈希值，用于检测变更
-                    instance._config_hash = hashlib.md5(content.encode()).hexdigest()
-                    return instance
+                data = orjson.loads(content) if orjson is not None else json.loads(content)
+                instance = cls(**data)
+                # 保存配置文件的哈希值，用于检测变更
+                instance._config_hash = _content_hash(content)
+                return instance
             except Exception as e:
                 logging.warning(f"加载客户端配置失败: {e}，使用默认配置")
         
@@ -174,18 +207,16 @@ class ClientConfig:
         try:
             config_path = self.get_config_path()
             
-            # 创建配置数据的副本，排除所有私有属性（以_开头的字段）
-            config_dict = asdict(self)
-            # 过滤掉所有内部字段，避免配置文件污染
-            config_dict = {k: v for k, v in config_dict.items() if not k.startswith('_')}
+            # 直接读取字段构建字典（不经 asdict 的深拷贝），排除所有私有属性（以_开头的字段），避免配置文件污染
+            config_dict = {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith('_')}
             
             # 生成新的配置内容和哈希
-            new_content = json.dumps(config_dict, indent=2, ensure_ascii=False)
-            new_hash = hashlib.md5(new_content.encode()).hexdigest()
+            new_content = _dumps_config(config_dict)
+            new_hash = _content_hash(new_content)
             
             # 仅在配置变更时写入文件
             if new_hash != self._config_hash:
-                with open(config_path, 'w', encoding='utf-8') as f:
+                with open(config_path, 'wb') as f:
                     f.write(new_content)
                 self._config_hash = new_hash
                 logging.debug("配置已保存到文件")
@@ -210,7 +241,6 @@ class ClientConfig:
         else:
             # 验证URL格式
             try:
-                from urllib.parse import urlparse
                 parsed = urlparse(self.server_base)
                 if not parsed.netloc:
                     errors.append(f"无效的服务端地址格式: {self.server_base}")
@@ -244,10 +274,15 @@ class ClientConfig:
         elif self.restart_cooldown_sec < 30:
             warnings.append(f"重启冷却时间较短 ({self.restart_cooldown_sec}s)，可能导致频繁重启")
         
+        # 验证HTTP连接池配置
+        if self.http_pool_connections < 1:
+            errors.append(f"HTTP连接池数量不能小于 1，当前: {self.http_pool_connections}")
+        if self.http_pool_maxsize < 0:
+            errors.append(f"HTTP连接池最大连接数不能为负数，当前: {self.http_pool_maxsize}")
+        
         # 验证日志配置
-        valid_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-        if self.log_level not in valid_levels:
-            errors.append(f"日志级别必须是: {', '.join(valid_levels)}，当前: {self.log_level}")
+        if self.log_level not in VALID_LOG_LEVELS:
+            errors.append(f"日志级别必须是: {', '.join(VALID_LOG_LEVELS)}，当前: {self.log_level}")
         
         # 验证ZeroTier配置
         if not self.zerotier_service_names:
@@ -259,25 +294,9 @@ class ClientConfig:
         if not self.zerotier_adapter_keywords:
             errors.append("ZeroTier网络适配器关键词列表不能为空")
         
-        # 验证路径有效性（使用缓存减少IO）
-        import os
-        import time
-        
-        current_time = time.time()
-        # 检查缓存是否有效
-        if (self._path_cache is None or 
-            current_time - self._cache_timestamp > self._cache_ttl):
-            # 重新验证并更新缓存
-            self._path_cache = {}
-            for path in (self.zerotier_bin_paths or []):
-                try:
-                    self._path_cache[path] = os.path.exists(path)
-                except (OSError, ValueError):
-                    self._path_cache[path] = False
-            self._cache_timestamp = current_time
-        
-        # 使用缓存结果
-        valid_bin_paths = [path for path, exists in self._path_cache.items() if exists]
+        # 验证路径有效性（使用模块级缓存减少IO）
+        path_exists = _paths_exist(self.zerotier_bin_paths or [])
+        valid_bin_paths = [path for path, exists in path_exists.items() if exists]
         
         if not valid_bin_paths:
             warnings.append("未找到有效的ZeroTier可执行文件路径，可能需要手动配置")
@@ -295,7 +314,6 @@ class ClientConfig:
         
         # 打印警告信息
         if warnings:
-            import logging
             logging.warning("客户端配置验证警告:")
             for warning in warnings:
                 logging.warning(f"  - {warning}")
@@ -1,15 +1,23 @@
 import logging
 import os
 import re
+import shutil
 import subprocess
 import sys
+import threading
 import time
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import winreg
+except ImportError:  # 非 Windows 平台
+    winreg = None
 
 import psutil
 import socket
 
+from . import _win_sc
 from .config import ClientConfig
 
 # 尝试导入统一日志工具和网络工具（修复相对导入问题）
@@ -100,7 +108,8 @@ def _setup_logging_fallback(config: ClientConfig):
                 str(log_path),  # 使用处理后的路径
                 maxBytes=10*1024*1024,  # 10MB
                 backupCount=5,
-                encoding='utf-8'
+                encoding='utf-8',
+                delay=True  # 首次写入日志时才打开文件
             )
             file_handler.setFormatter(formatter)
             logger.addHandler(file_handler)
@@ -115,7 +124,7 @@ def _setup_logging_fallback(config: ClientConfig):
                 if log_dir:
                     log_dir.mkdir(parents=True, exist_ok=True)
                 
-                file_handler = logging.FileHandler(str(log_path), encoding='utf-8')
+                file_handler = logging.FileHandler(str(log_path), encoding='utf-8', delay=True)
                 file_handler.setFormatter(formatter)
                 logger.addHandler(file_handler)
                 logging.warning(f"使用普通日志文件: {log_path}")
@@ -123,30 +132,83 @@ def _setup_logging_fallback(config: ClientConfig):
                 logging.error(f"无法创建日志文件 {config.log_file}: {e2}")
 
 
+# 运行平台在进程生命周期内不变，导入时判断一次
+_IS_WINDOWS = sys.platform.startswith("win")
+
+
 def is_windows() -> bool:
     """判断是否为 Windows 系统"""
-    return sys.platform.startswith("win")
+    return _IS_WINDOWS
+
+
+# find_executable 的短期结果缓存：候选列表 -> (结果, 过期时刻(单调时钟))，
+# 重启流程中短时间内会多次查找同一组候选路径
+_FIND_EXEC_TTL_SEC = 5.0
+_find_exec_cache: Dict[Tuple[str, ...], Tuple[Optional[str], float]] = {}
 
 
 def find_executable(candidates: List[str]) -> Optional[str]:
     """在候选路径中查找可执行文件"""
+    key = tuple(candidates)
+    cached = _find_exec_cache.get(key)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    result = _find_executable_uncached(candidates)
+    _find_exec_cache[key] = (result, time.monotonic() + _FIND_EXEC_TTL_SEC)
+    return result
+
+
+def _find_executable_uncached(candidates: List[str]) -> Optional[str]:
+    """逐个检查候选路径（不使用缓存）"""
+    # Unix系统需要额外检查可执行权限
+    check_exec = not _IS_WINDOWS
     for path in candidates:
-        if os.path.exists(path):
-            # Unix系统需要额外检查可执行权限
-            if not is_windows() and not os.access(path, os.X_OK):
-                logging.debug(f"文件存在但无执行权限: {path}")
-                continue
-            logging.debug(f"找到可执行文件: {path}")
-            return path
+        # 一次 stat 同时得到是否存在和权限位，不再分别调用 exists 和 access
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
+            continue
+        if check_exec and not st.st_mode & 0o111:
+            logging.debug(f"文件存在但无执行权限: {path}")
+            continue
+        logging.debug(f"找到可执行文件: {path}")
+        return path
     logging.debug(f"未找到可执行文件，候选路径: {candidates}")
     return None
 
 
+# discover_zerotier_paths 的结果缓存：完整扫描涉及大量文件检查和注册表读取
+_DISCOVER_CACHE_TTL_SEC = 60.0
+_discovered_paths: Optional[dict] = None
+_discovered_at = 0.0  # 单调时钟
+
+
+def invalidate_zerotier_paths() -> None:
+    """清除路径发现缓存（启动时找不到可执行文件，可能是 ZeroTier 被重新安装到了其他位置）"""
+    global _discovered_paths
+    _discovered_paths = None
+
+
 def discover_zerotier_paths() -> dict:
-    """自动发现 ZeroTier 路径（增强版）"""
-    import subprocess
-    import shutil
-    
+    """自动发现 ZeroTier 路径（结果缓存一段时间，返回副本，调用方可自由修改）"""
+    global _discovered_paths, _discovered_at
+    if _discovered_paths is None or time.monotonic() - _discovered_at >= _DISCOVER_CACHE_TTL_SEC:
+        _discovered_paths = _scan_zerotier_paths()
+        _discovered_at = time.monotonic()
+    return {key: list(value) for key, value in _discovered_paths.items()}
+
+
+def _dir_entry_names(location: str) -> Optional[set]:
+    """列出目录中的文件名（小写，Windows 文件名不区分大小写）；目录不存在或无法读取时返回 None"""
+    try:
+        with os.scandir(location) as it:
+            return {entry.name.lower() for entry in it}
+    except OSError:
+        return None
+
+
+def _scan_zerotier_paths() -> dict:
+    """扫描 ZeroTier 安装路径（增强版）"""
     paths = {
         'service_bin': [],
         'gui_bin': [],
@@ -161,23 +223,25 @@ def discover_zerotier_paths() -> dict:
             r"C:\Program Files (x86)\ZeroTier\One"
         ]
         
+        scanned_locations = {os.path.normcase(location) for location in common_locations}
         for location in common_locations:
-            if os.path.exists(location):
-                # 查找服务可执行文件
-                for exe_name in ["zerotier-one_x64.exe", "zerotier-one.exe"]:
-                    exe_path = os.path.join(location, exe_name)
-                    if os.path.exists(exe_path):
-                        paths['service_bin'].append(exe_path)
-                
-                # 查找GUI可执行文件
-                for gui_name in ["zerotier_desktop_ui.exe", "ZeroTier One.exe"]:
-                    gui_path = os.path.join(location, gui_name)
-                    if os.path.exists(gui_path):
-                        paths['gui_bin'].append(gui_path)
+            # 每个目录只枚举一次，代替对每个候选文件单独 stat
+            entries = _dir_entry_names(location)
+            if entries is None:
+                continue
+            
+            # 查找服务可执行文件
+            for exe_name in ["zerotier-one_x64.exe", "zerotier-one.exe"]:
+                if exe_name.lower() in entries:
+                    paths['service_bin'].append(os.path.join(location, exe_name))
+            
+            # 查找GUI可执行文件
+            for gui_name in ["zerotier_desktop_ui.exe", "ZeroTier One.exe"]:
+                if gui_name.lower() in entries:
+                    paths['gui_bin'].append(os.path.join(location, gui_name))
         
         # 尝试通过注册表查找
-        try:
-            import winreg
+        if winreg is not None:
             key_paths = [
                 r"SOFTWARE\ZeroTier",
                 r"SOFTWARE\WOW6432Node\ZeroTier"
@@ -186,30 +250,27 @@ def discover_zerotier_paths() -> dict:
                 try:
                     with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path) as key:
                         install_path = winreg.QueryValueEx(key, "InstallPath")[0]
-                        if os.path.exists(install_path):
-                            for exe in ["zerotier-one_x64.exe", "zerotier-one.exe"]:
-                                full_path = os.path.join(install_path, exe)
-                                if os.path.exists(full_path) and full_path not in paths['service_bin']:
-                                    paths['service_bin'].append(full_path)
+                        # 安装目录通常就是上面已检查过的常见位置，跳过以免重复枚举
+                        if os.path.normcase(os.path.normpath(install_path)) in scanned_locations:
+                            continue
+                        entries = _dir_entry_names(install_path)
+                        if entries is None:
+                            continue
+                        # 重复项由末尾的 dict.fromkeys 统一去除
+                        for exe in ["zerotier-one_x64.exe", "zerotier-one.exe"]:
+                            if exe in entries:
+                                paths['service_bin'].append(os.path.join(install_path, exe))
                 except (FileNotFoundError, OSError):
                     continue
-        except ImportError:
-            pass
         
         # Windows 服务名称
         paths['service_names'] = ["ZeroTier One", "ZeroTierOneService", "zerotier-one"]
         
     else:
-        # Linux/macOS: 使用 which 和常见路径
-        try:
-            which_result = subprocess.run(['which', 'zerotier-one'], 
-                                        capture_output=True, text=True, timeout=5)
-            if which_result.returncode == 0:
-                found_path = which_result.stdout.strip()
-                if found_path and os.path.exists(found_path):
-                    paths['service_bin'].append(found_path)
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
+        # Linux/macOS: 在 PATH 中查找（进程内完成，无需启动 which 子进程）和常见路径
+        found_path = shutil.which('zerotier-one')
+        if found_path:
+            paths['service_bin'].append(found_path)
         
         # 检查常见Linux路径
         linux_paths = [
@@ -220,7 +281,7 @@ def discover_zerotier_paths() -> dict:
         ]
         
         for path in linux_paths:
-            if os.path.exists(path) and path not in paths['service_bin']:
+            if os.path.exists(path):
                 paths['service_bin'].append(path)
         
         # Linux 服务名称
@@ -230,7 +291,7 @@ def discover_zerotier_paths() -> dict:
     for key in ['service_bin', 'gui_bin']:
         paths[key] = list(dict.fromkeys(paths[key]))  # 保持顺序的去重
     
-    logging.info(f"自动发现 ZeroTier 路径: {paths}")
+    logging.info("自动发现 ZeroTier 路径: %s", paths)
     return paths
 
 
@@ -266,6 +327,23 @@ def get_service_status(config: ClientConfig) -> str:
         return _get_linux_service_status()
 
 
+def _keyword_pattern(*keywords: str) -> "re.Pattern[str]":
+    """将多个关键词编译为一个忽略大小写的正则（一次扫描输出即可判断是否包含任一关键词）"""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+
+# sc query 输出的多语言状态关键词（英文+中文+常见本地化）
+_SC_STATE_RE = _keyword_pattern("STATE", "状态")
+_SC_RUNNING_RE = _keyword_pattern("RUNNING", "运行", "正在运行", "DÉMARRÉ", "EJECUTÁNDOSE", "実行中")
+_SC_STOPPED_RE = _keyword_pattern("STOPPED", "STOP_PENDING", "停止", "已停止", "停止挂起", "ARRÊTÉ", "DETENIDO", "停止中")
+_SC_STARTING_RE = _keyword_pattern("START_PENDING", "启动挂起", "正在启动", "EN COURS", "INICIANDO", "開始中")
+_SC_NOT_EXIST_RE = _keyword_pattern(
+    "does not exist", "服务不存在", "指定的服务不存在",
+    "n'existe pas", "no existe", "存在しません",
+    "cannot be found", "找不到", "未找到",
+)
+
+
 def _get_windows_service_status(service_names: List[str]) -> str:
     """获取 Windows 服务状态 - 增强错误处理和本地化兼容性"""
     if not service_names:
@@ -278,43 +356,43 @@ def _get_windows_service_status(service_names: List[str]) -> str:
             logging.warning(f"跳过无效服务名称: {repr(name)}")
             continue
             
+        # 优先直接调用服务控制管理器 API，失败时才回退到 sc.exe
+        try:
+            state = _win_sc.query_service_state(name.strip())
+        except OSError as e:
+            logging.debug("通过 SCM API 查询 Windows 服务 %s 失败，回退到 sc: %s", name, e)
+        else:
+            if state is None:
+                logging.debug("Windows 服务 %s 不存在", name)
+                continue
+            logging.debug("Windows 服务 %s 状态: %s", name, state)
+            return state
+        
         try:
             result = run_command(["sc", "query", name.strip()], timeout=10)
             
-            # 兼容多语言的状态检查
-            stdout_upper = result.stdout.upper()
-            stdout_lower = result.stdout.lower()
+            # 兼容多语言的状态检查（预编译的忽略大小写正则，无需先转换大小写）
+            stdout = result.stdout
             
-            if "STATE" in stdout_upper or "状态" in result.stdout:
-                # 运行状态检查（英文+中文+常见本地化）
-                running_keywords = ["RUNNING", "运行", "正在运行", "DÉMARRÉ", "EJECUTÁNDOSE", "実行中"]
-                if any(keyword in stdout_upper for keyword in running_keywords):
+            if _SC_STATE_RE.search(stdout):
+                if _SC_RUNNING_RE.search(stdout):
                     logging.debug(f"Windows 服务 {name} 正在运行")
                     return "running"
                 
-                # 停止状态检查
-                stopped_keywords = ["STOPPED", "STOP_PENDING", "停止", "已停止", "停止挂起", "ARRÊTÉ", "DETENIDO", "停止中"]
-                if any(keyword in stdout_upper for keyword in stopped_keywords):
+                if _SC_STOPPED_RE.search(stdout):
                     logging.debug(f"Windows 服务 {name} 已停止")
                     return "stopped"
                 
-                # 启动中状态检查
-                starting_keywords = ["START_PENDING", "启动挂起", "正在启动", "EN COURS", "INICIANDO", "開始中"]
-                if any(keyword in stdout_upper for keyword in starting_keywords):
+                if _SC_STARTING_RE.search(stdout):
                     logging.debug(f"Windows 服务 {name} 正在启动")
                     return "starting"
                 
                 # 未知状态
-                logging.debug(f"Windows 服务 {name} 状态未知: {result.stdout}")
+                logging.debug(f"Windows 服务 {name} 状态未知: {stdout}")
                 return "unknown"
             
             # 服务不存在检查（多语言）
-            not_exist_keywords = [
-                "does not exist", "服务不存在", "指定的服务不存在", 
-                "n'existe pas", "no existe", "存在しません",
-                "cannot be found", "找不到", "未找到"
-            ]
-            if any(keyword in stdout_lower for keyword in not_exist_keywords):
+            if _SC_NOT_EXIST_RE.search(stdout):
                 logging.debug(f"Windows 服务 {name} 不存在")
                 continue
             else:
@@ -393,10 +471,13 @@ def _get_linux_service_status() -> str:
 
 def start_service(config: ClientConfig) -> bool:
     """启动 ZeroTier 服务"""
-    if is_windows():
-        return _start_windows_service(config)
-    else:
-        return _start_linux_service()
+    try:
+        if is_windows():
+            return _start_windows_service(config)
+        else:
+            return _start_linux_service()
+    finally:
+        invalidate_interface_cache()  # 服务启停会增删 ZeroTier 虚拟网卡
 
 
 def _start_windows_service(config: ClientConfig) -> bool:
@@ -452,6 +533,7 @@ def _start_windows_service(config: ClientConfig) -> bool:
             logging.error(f"直接启动守护进程失败: {e}")
     else:
         logging.error("未找到 ZeroTier 可执行文件")
+        invalidate_zerotier_paths()
     
     logging.error("所有启动 Windows 服务的方法都失败了")
     if service_errors:
@@ -459,19 +541,32 @@ def _start_windows_service(config: ClientConfig) -> bool:
     return False
 
 
+# 进程的有效用户在运行期间不变，导入时判断一次是否为 root（Windows 没有 geteuid）
+try:
+    _IS_ROOT = hasattr(os, 'geteuid') and getattr(os, 'geteuid')() == 0
+except OSError:
+    _IS_ROOT = False
+
+# 免密码 sudo 检测结果缓存：(结果, 过期时刻(单调时钟))；一次重启流程中启停服务共用
+_SUDO_CHECK_TTL_SEC = 30.0
+_sudo_nopasswd: Optional[Tuple[bool, float]] = None
+
+
+def _can_sudo_nopasswd() -> bool:
+    """测试 sudo 无密码权限（运行 sudo -n true，结果缓存 30 秒）"""
+    global _sudo_nopasswd
+    cached = _sudo_nopasswd
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    allowed = run_command(["sudo", "-n", "true"], timeout=5).returncode == 0
+    _sudo_nopasswd = (allowed, time.monotonic() + _SUDO_CHECK_TTL_SEC)
+    return allowed
+
+
 def _start_linux_service() -> bool:
     """启动 Linux 服务"""
     try:
-        # 检查是否为 root 用户（仅在 Unix 系统上）
-        is_root = False
-        try:
-            if hasattr(os, 'geteuid'):
-                is_root = getattr(os, 'geteuid')() == 0
-        except (AttributeError, OSError):
-            # Windows 系统没有 geteuid 或其他权限问题
-            pass
-        
-        if is_root:
+        if _IS_ROOT:
             # root 用户直接执行
             result = run_command(["systemctl", "start", "zerotier-one"], timeout=15)
             logging.info("Linux 服务 zerotier-one 启动成功")
@@ -479,9 +574,7 @@ def _start_linux_service() -> bool:
         else:
             # 非 root 用户，检查 sudo 权限
             try:
-                # 测试 sudo 无密码权限
-                test_result = run_command(["sudo", "-n", "true"], timeout=5)
-                if test_result.returncode != 0:
+                if not _can_sudo_nopasswd():
                     logging.error("启动 Linux 服务需要 sudo 权限，请配置免密码 sudo 或以 root 身份运行")
                     return False
                 
@@ -500,10 +593,13 @@ def _start_linux_service() -> bool:
 
 def stop_service(config: ClientConfig) -> bool:
     """停止 ZeroTier 服务"""
-    if is_windows():
-        return _stop_windows_service(config)
-    else:
-        return _stop_linux_service()
+    try:
+        if is_windows():
+            return _stop_windows_service(config)
+        else:
+            return _stop_linux_service()
+    finally:
+        invalidate_interface_cache()  # 服务启停会增删 ZeroTier 虚拟网卡
 
 
 def _stop_windows_service(config: ClientConfig) -> bool:
@@ -562,16 +658,7 @@ def _stop_windows_service(config: ClientConfig) -> bool:
 def _stop_linux_service() -> bool:
     """停止 Linux 服务"""
     try:
-        # 检查是否为 root 用户（仅在 Unix 系统上）
-        is_root = False
-        try:
-            if hasattr(os, 'geteuid'):
-                is_root = getattr(os, 'geteuid')() == 0
-        except (AttributeError, OSError):
-            # Windows 系统没有 geteuid 或其他权限问题
-            pass
-        
-        if is_root:
+        if _IS_ROOT:
             # root 用户直接执行
             result = run_command(["systemctl", "stop", "zerotier-one"], timeout=15)
             if result.returncode == 0:
@@ -580,9 +667,7 @@ def _stop_linux_service() -> bool:
         else:
             # 非 root 用户，检查 sudo 权限
             try:
-                # 测试 sudo 无密码权限
-                test_result = run_command(["sudo", "-n", "true"], timeout=5)
-                if test_result.returncode != 0:
+                if not _can_sudo_nopasswd():
                     logging.error("停止 Linux 服务需要 sudo 权限，请配置免密码 sudo 或以 root 身份运行")
                     return False
                 
@@ -600,95 +685,144 @@ def _stop_linux_service() -> bool:
         return False
 
 
+# ZeroTier 进程识别规则（模块加载时构建一次，进程名按小写比较）
+_SERVICE_UNAMBIGUOUS_NAMES = (
+    "zerotier-one_x64.exe",      # Windows 64位服务进程
+    "zerotier-one_x86.exe",      # Windows 32位服务进程
+)
+_SERVICE_AMBIGUOUS_NAMES = (     # 可能与其他程序同名，需结合路径确认
+    "zerotier-one.exe",          # 通用服务进程名
+    "zerotierone",               # 服务进程简化名
+)
+# 路径规则预编译为忽略大小写的正则，无需先把路径转为小写再逐个子串判断
+_SERVICE_PATH_RE = _keyword_pattern("programdata", "system32", "/usr/sbin/", "/usr/local/sbin/")
+_GUI_PATH_RE = _keyword_pattern("program files")  # 同时覆盖 program files (x86)
+_GUI_PROCESS_NAMES = (
+    "zerotier one.exe",          # ZeroTier One GUI主程序
+    "zerotier_desktop_ui.exe",   # ZeroTier Desktop UI
+)
+_GUI_EXCLUDED_PATH_RE = _keyword_pattern("programdata", "system32", "windows")  # 位于这些目录的同名进程是服务而非GUI
+
+# 进程扫描结果缓存：(过期时刻(单调时钟), 服务进程列表, GUI进程列表)
+_PROCESS_SCAN_TTL_SEC = 1.0
+_process_scan_cache: Optional[Tuple[float, List[psutil.Process], List[psutil.Process]]] = None
+
+
+def invalidate_process_scan() -> None:
+    """清除进程扫描缓存（启动/终止 ZeroTier 进程后调用）"""
+    global _process_scan_cache
+    _process_scan_cache = None
+
+
+def _scan_zerotier_processes() -> Tuple[List[psutil.Process], List[psutil.Process]]:
+    """遍历一次进程表，同时找出 ZeroTier 服务进程和 GUI 应用进程
+    
+    结果缓存 1 秒，状态查询与停止操作共用；命中缓存时剔除期间已退出的进程。
+    """
+    global _process_scan_cache
+    cache = _process_scan_cache
+    if cache is not None and cache[0] > time.monotonic():
+        return ([p for p in cache[1] if p.is_running()],
+                [p for p in cache[2] if p.is_running()])
+    
+    services: List[psutil.Process] = []
+    guis: List[psutil.Process] = []
+    # 遍历时只取进程名：获取 exe 在 Windows 上需要对每个进程 OpenProcess，
+    # 只对名称匹配的少数进程再单独查询路径
+    for process in psutil.process_iter(attrs=["name", "pid"]):
+        try:
+            name = (process.info.get("name") or "").lower()
+            # 所有匹配规则都包含 "zerotier"：绝大多数进程一次子串判断即可排除
+            if "zerotier" not in name:
+                continue
+            # 带架构后缀的服务进程名不会与GUI混淆，无需查询路径
+            if any(keyword in name for keyword in _SERVICE_UNAMBIGUOUS_NAMES):
+                logging.debug("找到ZeroTier服务进程: %s (PID: %s)", process.info['name'], process.info['pid'])
+                services.append(process)
+                continue
+            try:
+                exe_path = process.exe() or ""
+            except psutil.AccessDenied:
+                exe_path = ""
+            
+            if any(gui_name in name for gui_name in _GUI_PROCESS_NAMES):
+                # 通过路径进一步确认是GUI应用而不是服务；无法获取路径时保守地视为GUI应用
+                if exe_path and _GUI_EXCLUDED_PATH_RE.search(exe_path):
+                    logging.debug("跳过服务进程: %s (%s)", process.info['name'], exe_path)
+                    continue
+                logging.debug("找到 ZeroTier GUI应用进程: %s (%s)", process.info['name'], exe_path)
+                guis.append(process)
+            elif any(keyword in name for keyword in _SERVICE_AMBIGUOUS_NAMES):
+                # 通过路径进一步确认是服务进程
+                if exe_path:
+                    if _GUI_PATH_RE.search(exe_path):
+                        logging.debug("跳过GUI应用进程: %s (%s)", name, exe_path)
+                        continue
+                    if not _SERVICE_PATH_RE.search(exe_path):
+                        # 如果路径既不匹配服务也不匹配GUI，保守处理
+                        logging.debug("路径不明确的进程，跳过: %s (%s)", name, exe_path)
+                        continue
+                logging.debug("找到ZeroTier服务进程: %s (PID: %s) - %s", process.info['name'], process.info['pid'], exe_path)
+                services.append(process)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        except Exception as e:
+            logging.debug("检查进程时出错: %s", e)
+            continue
+    
+    _process_scan_cache = (time.monotonic() + _PROCESS_SCAN_TTL_SEC, services, guis)
+    return services, guis
+
+
+def _terminate_processes(processes: List[psutil.Process], kind: str, timeout: float) -> int:
+    """先向所有进程发送终止信号并统一等待，超时仍未退出的再强制杀死
+    
+    多个进程并行等待，最坏耗时为 timeout 而不是 timeout * 进程数。返回成功发出终止信号的进程数。
+    """
+    signaled = []
+    for process in processes:
+        try:
+            process.terminate()
+            signaled.append(process)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        except Exception as e:
+            logging.debug("终止进程时出错: %s", e)
+    if not signaled:
+        return 0
+    
+    gone, alive = psutil.wait_procs(signaled, timeout=timeout)
+    for process in gone:
+        logging.debug("%s进程 %s (PID: %s) 已退出", kind, process.info['name'], process.info['pid'])
+    
+    # 超时后还没退出，强制杀死
+    for process in alive:
+        try:
+            process.kill()
+            logging.warning("强制杀死%s进程 %s (PID: %s)", kind, process.info['name'], process.info['pid'])
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            # 进程可能已经退出或没有权限
+            pass
+    if alive:
+        psutil.wait_procs(alive, timeout=2)
+    return len(signaled)
+
+
 def _kill_zerotier_processes() -> bool:
     """强制终止 ZeroTier 服务进程（优先保留GUI应用）- 增强进程识别和错误处理"""
     killed = False
     processes_found = []
     
     try:
-        for process in psutil.process_iter(attrs=["name", "pid", "exe"]):
-            try:
-                name = process.info.get("name", "").lower()
-                exe_path = process.info.get("exe", "") or ""
-                
-                # 更精确的服务进程识别
-                is_service_process = False
-                
-                # 匹配服务进程的关键词
-                service_keywords = [
-                    "zerotier-one_x64.exe",      # Windows 64位服务进程
-                    "zerotier-one_x86.exe",      # Windows 32位服务进程  
-                    "zerotier-one.exe",          # 通用服务进程名
-                    "zerotierone",               # 服务进程简化名
-                ]
-                
-                for keyword in service_keywords:
-                    if keyword in name:
-                        is_service_process = True
-                        break
-                
-                # 通过路径进一步确认是服务进程
-                if is_service_process and exe_path:
-                    service_path_indicators = [
-                        "programdata",           # Windows服务常见位置
-                        "system32",             # 系统服务位置
-                        "/usr/sbin/",           # Linux服务位置
-                        "/usr/local/sbin/",     # Linux服务位置
-                    ]
-                    
-                    # 如果路径包含服务目录，确认为服务进程
-                    path_matches_service = any(indicator in exe_path.lower() for indicator in service_path_indicators)
-                    
-                    # 如果路径包含GUI目录，则不是服务进程
-                    gui_path_indicators = [
-                        "program files",         # GUI应用常见位置
-                        "program files (x86)",   # 32位GUI应用位置
-                    ]
-                    path_matches_gui = any(indicator in exe_path.lower() for indicator in gui_path_indicators)
-                    
-                    if path_matches_gui:
-                        logging.debug(f"跳过GUI应用进程: {name} ({exe_path})")
-                        is_service_process = False
-                    elif not path_matches_service:
-                        # 如果路径既不匹配服务也不匹配GUI，保守处理
-                        logging.debug(f"路径不明确的进程，跳过: {name} ({exe_path})")
-                        is_service_process = False
-                
-                if is_service_process:
-                    pid = process.info['pid']
-                    process_name = process.info['name']
-                    processes_found.append(f"{process_name} (PID: {pid})")
-                    
-                    logging.debug(f"找到ZeroTier服务进程: {process_name} (PID: {pid}) - {exe_path}")
-                    
-                    # 先尝试正常终止
-                    process.terminate()
-                    killed = True
-                    
-                    # 等待进程退出，最多等待5秒
-                    try:
-                        process.wait(timeout=5)
-                        logging.debug(f"服务进程 {process_name} (PID: {pid}) 已正常退出")
-                    except psutil.TimeoutExpired:
-                        # 如果5秒后还没退出，强制杀死
-                        try:
-                            process.kill()
-                            logging.warning(f"强制杀死服务进程 {process_name} (PID: {pid})")
-                        except (psutil.NoSuchProcess, psutil.AccessDenied):
-                            # 进程可能已经退出或没有权限
-                            pass
-                    except psutil.NoSuchProcess:
-                        # 进程已经退出
-                        logging.debug(f"服务进程 {process_name} (PID: {pid}) 已退出")
-                        
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-            except Exception as e:
-                logging.debug(f"检查进程时出错: {e}")
-                continue
-                
+        services, _ = _scan_zerotier_processes()
+        processes_found = [f"{process.info['name']} (PID: {process.info['pid']})" for process in services]
+        # 先尝试正常终止，最多等待5秒
+        killed = _terminate_processes(services, "服务", timeout=5) > 0
     except Exception as e:
         logging.error(f"终止 ZeroTier 服务进程时出错: {e}")
+    finally:
+        invalidate_process_scan()
+        invalidate_interface_cache()
     
     if processes_found:
         logging.info(f"找到并尝试终止 {len(processes_found)} 个ZeroTier服务进程: {', '.join(processes_found)}")
@@ -703,38 +837,14 @@ def _kill_zerotier_processes() -> bool:
 def get_app_status() -> str:
     """获取 ZeroTier GUI应用状态"""
     try:
-        for process in psutil.process_iter(attrs=["name", "exe"]):
-            name = process.info.get("name", "").lower()
-            exe_path = process.info.get("exe", "") or ""
-            
-            # 匹配GUI应用进程名
-            gui_names = [
-                "zerotier one.exe",           # ZeroTier One GUI主程序
-                "zerotier_desktop_ui.exe",    # ZeroTier Desktop UI
-            ]
-            
-            is_gui_app = any(gui_name in name for gui_name in gui_names)
-            
-            # 通过路径进一步确认是GUI应用而不是服务
-            if is_gui_app and exe_path:
-                # 如果路径包含服务目录，则跳过（避免将服务进程误认为GUI应用）
-                service_paths = ["programdata", "system32", "windows"]
-                if any(service_path in exe_path.lower() for service_path in service_paths):
-                    logging.debug(f"跳过服务进程: {process.info['name']} ({exe_path})")
-                    continue
-                    
-                logging.debug(f"找到 ZeroTier GUI应用进程: {process.info['name']} ({exe_path})")
-                return "running"
-            elif is_gui_app:
-                # 如果无法获取路径信息，保守处理
-                logging.debug(f"找到 ZeroTier GUI应用进程: {process.info['name']}")
-                return "running"
-                
-        logging.debug("未找到 ZeroTier GUI应用进程")
-        return "stopped"
+        _, guis = _scan_zerotier_processes()
     except Exception as e:
         logging.error(f"检查GUI应用状态时出错: {e}")
         return "unknown"
+    if guis:
+        return "running"
+    logging.debug("未找到 ZeroTier GUI应用进程")
+    return "stopped"
 
 
 def start_app(config: ClientConfig) -> bool:
@@ -747,6 +857,7 @@ def start_app(config: ClientConfig) -> bool:
     
     if not exe_path:
         logging.error("未找到 ZeroTier 可执行文件")
+        invalidate_zerotier_paths()
         return False
     
     try:
@@ -759,6 +870,8 @@ def start_app(config: ClientConfig) -> bool:
             subprocess.Popen([exe_path])
         
         time.sleep(1.5)
+        invalidate_process_scan()
+        invalidate_interface_cache()
         logging.info(f"ZeroTier 应用启动成功: {exe_path}")
         return True
     except Exception as e:
@@ -770,62 +883,16 @@ def stop_app() -> bool:
     """停止 ZeroTier GUI应用（不包括服务进程）"""
     stopped = False
     try:
-        for process in psutil.process_iter(attrs=["name", "pid", "exe"]):
-            try:
-                name = process.info.get("name", "").lower()
-                exe_path = process.info.get("exe", "") or ""
-                
-                # 仅匹配GUI应用进程，排除服务进程
-                is_gui_app = False
-                
-                # 匹配GUI应用的进程名
-                gui_names = [
-                    "zerotier one.exe",           # ZeroTier One GUI主程序
-                    "zerotier_desktop_ui.exe",    # ZeroTier Desktop UI
-                ]
-                
-                for gui_name in gui_names:
-                    if gui_name in name:
-                        is_gui_app = True
-                        break
-                
-                # 通过路径进一步确认是GUI应用而不是服务
-                if is_gui_app and exe_path:
-                    # 如果路径包含服务目录，则跳过（避免误杀服务进程）
-                    service_paths = ["programdata", "system32", "windows"]
-                    if any(service_path in exe_path.lower() for service_path in service_paths):
-                        logging.debug(f"跳过服务进程: {process.info['name']} ({exe_path})")
-                        continue
-                
-                if is_gui_app:
-                    pid = process.info['pid']
-                    process_name = process.info['name']
-                    logging.debug(f"找到GUI应用进程: {process_name} (PID: {pid})")
-                    
-                    # 先尝试正常终止
-                    process.terminate()
-                    stopped = True
-                    
-                    # 等待进程退出，最多等待3秒
-                    try:
-                        process.wait(timeout=3)
-                        logging.debug(f"GUI应用进程 {process_name} (PID: {pid}) 已正常退出")
-                    except psutil.TimeoutExpired:
-                        # 如果3秒后还没退出，强制杀死
-                        try:
-                            process.kill()
-                            logging.warning(f"强制杀死GUI应用进程 {process_name} (PID: {pid})")
-                        except (psutil.NoSuchProcess, psutil.AccessDenied):
-                            # 进程可能已经退出或没有权限
-                            pass
-                    except psutil.NoSuchProcess:
-                        # 进程已经退出
-                        logging.debug(f"GUI应用进程 {process_name} (PID: {pid}) 已退出")
-                        
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        _, guis = _scan_zerotier_processes()
+        for process in guis:
+            logging.debug("找到GUI应用进程: %s (PID: %s)", process.info['name'], process.info['pid'])
+        # 先尝试正常终止，最多等待3秒
+        stopped = _terminate_processes(guis, "GUI应用", timeout=3) > 0
     except Exception as e:
         logging.error(f"停止 ZeroTier 应用时出错: {e}")
+    finally:
+        invalidate_process_scan()
+        invalidate_interface_cache()
     
     if stopped:
         logging.info("ZeroTier 应用停止成功")
@@ -881,12 +948,62 @@ def ping(host: str, timeout_sec: int = 3) -> bool:
             return _basic_ping(host, timeout_sec)
 
 
+def terminate_active_pings() -> int:
+    """终止正在运行的 ping 子进程 - 使用统一网络工具"""
+    try:
+        from ..common.network_utils import terminate_active_pings as unified_terminate
+        return unified_terminate()
+    except ImportError:
+        try:
+            from common.network_utils import terminate_active_pings as unified_terminate
+            return unified_terminate()
+        except ImportError:
+            # 基本实现的 ping 不登记子进程，无可终止
+            return 0
+
+
+def fast_ping(host: str, timeout_sec: int = 3, cancel: Optional[threading.Event] = None) -> bool:
+    """轻量级可达性探测（尽量不启动 ping 子进程）- 使用统一网络工具；cancel 设置后不再启动 ping 子进程"""
+    try:
+        from ..common.network_utils import fast_ping as unified_fast_ping
+        return unified_fast_ping(host, timeout_sec, cancel)
+    except ImportError:
+        try:
+            from common.network_utils import fast_ping as unified_fast_ping
+            return unified_fast_ping(host, timeout_sec, cancel)
+        except ImportError:
+            # 回退到基本实现
+            return _basic_ping(host, timeout_sec)
+
+
+# psutil.net_if_addrs 结果缓存：(过期时刻(单调时钟), 结果)；Windows 上每次枚举网卡都要调用 GetAdaptersAddresses
+_IFADDRS_TTL_SEC = 1.0
+_ifaddrs_cache: Optional[Tuple[float, dict]] = None
+
+
+def invalidate_interface_cache() -> None:
+    """清除网卡地址缓存（启停 ZeroTier 服务或应用后调用）"""
+    global _ifaddrs_cache
+    _ifaddrs_cache = None
+
+
+def _cached_net_if_addrs() -> dict:
+    """获取网卡地址列表，短时间内的重复调用复用上一次枚举结果"""
+    global _ifaddrs_cache
+    cache = _ifaddrs_cache
+    if cache is not None and cache[0] > time.monotonic():
+        return cache[1]
+    addrs = psutil.net_if_addrs()
+    _ifaddrs_cache = (time.monotonic() + _IFADDRS_TTL_SEC, addrs)
+    return addrs
+
+
 def get_zerotier_ips(config: ClientConfig) -> List[str]:
     """获取本地 ZeroTier 网络接口的 IP 地址（支持IPv4和IPv6）"""
     ips: List[str] = []
     
     try:
-        interfaces = psutil.net_if_addrs()
+        interfaces = _cached_net_if_addrs()
         
         for interface_name, addresses in interfaces.items():
             is_zerotier = any(
@@ -924,11 +1041,33 @@ def get_zerotier_ips(config: ClientConfig) -> List[str]:
     return ips
 
 
+def local_link_up(config: ClientConfig) -> bool:
+    """检查本机是否有处于连接状态的物理/普通网络接口（排除回环和 ZeroTier 虚拟网卡）
+    
+    检测失败时返回 True，避免误判而阻止重启。
+    """
+    keywords = [keyword.lower() for keyword in (config.zerotier_adapter_keywords or [])]
+    try:
+        for interface_name, stats in psutil.net_if_stats().items():
+            if not stats.isup:
+                continue
+            name = interface_name.lower()
+            if name == 'lo' or name.startswith('loopback') or 'loopback' in getattr(stats, 'flags', ''):
+                continue
+            if any(keyword in name for keyword in keywords):
+                continue
+            return True
+        return False
+    except Exception as e:
+        logging.debug(f"检查本机网络链路状态时出错: {e}")
+        return True
+
+
 def _get_private_ips() -> List[str]:
     """获取所有私网 IP 地址（回退方案）"""
     ips = []
     try:
-        for interface_name, addresses in psutil.net_if_addrs().items():
+        for interface_name, addresses in _cached_net_if_addrs().items():
             for addr in addresses:
                 if getattr(addr, 'family', None) == socket.AF_INET:
                     ip = addr.address
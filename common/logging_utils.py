@@ -89,14 +89,15 @@ def setup_unified_logging(
                         str(log_path),  # 使用处理后的路径
                         maxBytes=max_bytes,
                         backupCount=backup_count,
-                        encoding='utf-8'
+                        encoding='utf-8',
+                        delay=True  # 首次写入日志时才打开文件
                     )
                     file_handler.setFormatter(formatter)
                     root_logger.addHandler(file_handler)
                     logging.info(f"日志文件已配置: {log_path} (轮转: {max_bytes//1024//1024}MB × {backup_count}个文件)")
                 else:
                     # 普通文件处理器
-                    file_handler = logging.FileHandler(str(log_path), encoding='utf-8')
+                    file_handler = logging.FileHandler(str(log_path), encoding='utf-8', delay=True)
                     file_handler.setFormatter(formatter)
                     root_logger.addHandler(file_handler)
                     logging.info(f"日志文件已配置: {log_path}")
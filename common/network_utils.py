@@ -5,18 +5,32 @@
 
 import logging
 import os
+import socket
 import subprocess
 import sys
+import threading
+import time
 from typing import Optional
 
+# ZeroTier 默认端口，TCP 探测时使用
+ZEROTIER_PORT = 9993
+# TCP 探测的超时上限：能判定的情况（连接成功/被拒绝）通常在一个 RTT 内返回，
+# 超时多半是防火墙丢弃，不应占满整个 ping 超时后才回退
+FAST_PING_TCP_TIMEOUT_SEC = 0.5
 
-def ping(host: str, timeout_sec: int = 3) -> bool:
+# 正在运行的 ping 子进程，停止时可通过 terminate_active_pings() 立即终止
+_active_pings: set = set()
+_active_pings_lock = threading.Lock()
+
+
+def ping(host: str, timeout_sec: int = 3, cancel: Optional[threading.Event] = None) -> bool:
     """
     Ping 指定主机 - 统一实现，支持 IPv4/IPv6
     
     Args:
         host: 目标主机地址（IP或域名）
         timeout_sec: 超时时间（秒）
+        cancel: 可选的取消事件，设置后不再启动新的 ping 子进程（直接返回 False）
         
     Returns:
         bool: ping 是否成功
@@ -32,7 +46,6 @@ def ping(host: str, timeout_sec: int = 3) -> bool:
             # 更严格的IPv6格式检测
             try:
                 # 尝试用socket库验证IPv6格式
-                import socket
                 socket.inet_pton(socket.AF_INET6, host)
                 is_ipv6 = True
             except (socket.error, AttributeError):
@@ -72,27 +85,96 @@ def ping(host: str, timeout_sec: int = 3) -> bool:
             cmd = ["ping", "-c", "1", "-W", str(timeout_sec), host]
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout_sec + 2  # 给subprocess额外的缓冲时间
-        )
-        # 统一采用返回码判断，避免解析本地化输出
-        success = (result.returncode == 0)
-        logging.debug(f"Ping {host}: {'成功' if success else '失败'}; rc={result.returncode}")
+        if cancel is not None and cancel.is_set():
+            return False
+        started = time.monotonic()
+        success = _run_ping(cmd, host, timeout_sec)
+        if not success and time.monotonic() - started < 0.2:
+            # 被 terminate_active_pings() 终止的 ping 也会快速失败，取消时不再重试
+            if cancel is not None and cancel.is_set():
+                return False
+            # 立即失败（如首包因 ARP/路径尚未建立被报告为目标不可达）不代表主机离线，重试一次，
+            # 避免偶发误判触发不必要的重启
+            logging.debug("Ping %s 快速失败，重试一次", host)
+            success = _run_ping(cmd, host, timeout_sec)
         return success
-    except subprocess.TimeoutExpired:
-        logging.debug(f"Ping {host} 超时")
-        return False
     except FileNotFoundError:
         logging.error(f"ping 命令不存在，无法ping {host}")
         return False
     except Exception as e:
-        logging.debug(f"Ping {host} 时出错: {e}")
+        logging.debug("Ping %s 时出错: %s", host, e)
         return False
 
 
+def _run_ping(cmd: list, host: str, timeout_sec: int) -> bool:
+    """执行一次 ping 子进程，按返回码判断是否成功"""
+    # 只看返回码，不需要输出；登记进程以便停止时可被 terminate_active_pings() 终止
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    with _active_pings_lock:
+        _active_pings.add(proc)
+    try:
+        returncode = proc.wait(timeout=timeout_sec + 2)  # 给subprocess额外的缓冲时间
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        logging.debug("Ping %s 超时", host)
+        return False
+    finally:
+        with _active_pings_lock:
+            _active_pings.discard(proc)
+    # 统一采用返回码判断，避免解析本地化输出（被终止时返回码非0，视为失败）
+    success = (returncode == 0)
+    logging.debug("Ping %s: %s; rc=%s", host, '成功' if success else '失败', returncode)
+    return success
+
+
+def terminate_active_pings() -> int:
+    """
+    终止所有正在运行的 ping 子进程（用于快速停止后台检测线程）
+    
+    Returns:
+        int: 被终止的进程数量
+    """
+    with _active_pings_lock:
+        procs = list(_active_pings)
+    for proc in procs:
+        try:
+            proc.terminate()
+        except OSError:
+            pass  # 进程已退出
+    return len(procs)
+
+
+def fast_ping(host: str, timeout_sec: int = 3, cancel: Optional[threading.Event] = None) -> bool:
+    """
+    轻量级可达性探测 - 尽量避免启动 ping 子进程
+    
+    依次尝试：
+    1. TCP 连接 ZeroTier 端口（超时不超过 FAST_PING_TCP_TIMEOUT_SEC）：连接成功或被拒绝（RST）都说明主机在线
+    2. 无法判定时（如 TCP 被防火墙丢弃导致超时）回退到 ping()
+    
+    Args:
+        host: 目标主机地址（IP或域名）
+        timeout_sec: 超时时间（秒）
+        cancel: 可选的取消事件，设置后不再回退到 ping 子进程（直接返回 False）
+        
+    Returns:
+        bool: 主机是否可达
+    """
+    try:
+        with socket.create_connection((host, ZEROTIER_PORT), timeout=min(FAST_PING_TCP_TIMEOUT_SEC, timeout_sec)):
+            pass
+        logging.debug("TCP 探测 %s:%d: 连接成功", host, ZEROTIER_PORT)
+        return True
+    except ConnectionRefusedError:
+        logging.debug("TCP 探测 %s:%d: 连接被拒绝，主机在线", host, ZEROTIER_PORT)
+        return True
+    except OSError as e:
+        logging.debug("TCP 探测 %s:%d 无法判定: %s，回退到 ping", host, ZEROTIER_PORT, e)
+    
+    return ping(host, timeout_sec, cancel)
+
+
 def validate_ip_address(ip: str) -> tuple[bool, str]:
     """
     严格验证IP地址，排除特殊用途地址
@@ -51,7 +51,8 @@ def reset_client_config(preserve_settings=True):
         if preserve_settings and old_config:
             preserved_fields = [
                 'server_base', 'api_key', 'target_ip', 
-                'ping_interval_sec', 'restart_cooldown_sec', 'ping_timeout_sec'
+                'ping_interval_sec', 'restart_cooldown_sec', 'ping_timeout_sec',
+                'http_pool_connections', 'http_pool_maxsize'
             ]
             for field in preserved_fields:
                 old_value = getattr(old_config, field, None)
@@ -25,7 +25,7 @@ from pathlib import Path
 from typing import List, Optional
 
 from fastapi import FastAPI, HTTPException, Request, Depends
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, ConfigDict
 
@@ -690,6 +690,12 @@ async def health_check():
         }
 
 
+@app.head("/health", include_in_schema=False)
+async def health_probe():
+    """轻量存活探测 - 只返回状态码，不收集系统指标"""
+    return Response(status_code=200)
+
+
 @app.get("/config",
          summary="获取配置信息",
          description="获取当前服务端配置参数",
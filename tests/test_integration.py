@@ -19,7 +19,8 @@ sys.path.insert(0, str(project_root))
 
 from server.config import ServerConfig
 from client.config import ClientConfig
-from client.app import ClientApp
+from client.app import (ClientApp, CIRCUIT_BREAKER_BASE_SEC, RESTART_TOKEN_MAX, RESTART_TOKEN_REFILL,
+                        RESTART_TOKEN_REFILL_COOLDOWNS, _LogRateLimiter)
 from common.network_utils import ping, validate_ip_address
 
 
@@ -166,6 +167,25 @@ class TestIntegration:
         
         errors = invalid_server_config.validate()
         assert len(errors) > 0, "无效配置应该有错误"
+    
+    def test_path_exists_cache_invalidated_on_dir_change(self, tmp_path):
+        """路径存在性缓存以目录 mtime 为键：目录未变时复用，目录变化后重新扫描"""
+        import os
+        import client.config as client_config
+        
+        target = str(tmp_path / "zerotier-one")
+        real_scandir = os.scandir
+        with patch.object(client_config.os, 'scandir', side_effect=real_scandir) as mock_scandir:
+            assert client_config._paths_exist([target]) == {target: False}
+            assert client_config._paths_exist([target]) == {target: False}
+            assert mock_scandir.call_count == 1
+            
+            (tmp_path / "zerotier-one").write_text("")
+            # 显式推进目录 mtime，避免文件系统时间精度导致 mtime 未变化
+            stat = os.stat(tmp_path)
+            os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            assert client_config._paths_exist([target]) == {target: True}
+            assert mock_scandir.call_count == 2
 
 
 class TestPerformance:
@@ -267,6 +287,275 @@ class TestErrorRecovery:
         assert len(results) == 50, f"应该有50个结果，实际: {len(results)}"
 
 
+class TestClientAppState:
+    """客户端状态机测试类（重启等待、熔断器、令牌桶等）"""
+    
+    @pytest.fixture
+    def app(self):
+        """构造一个不连接真实服务端的客户端实例"""
+        config = ClientConfig(
+            server_base="http://127.0.0.1:18080",
+            target_ip="127.0.0.1",
+            ping_interval_sec=5,
+            ping_timeout_sec=2,
+            auto_heal_enabled=False,
+            log_level="INFO"
+        )
+        with patch('client.config.ClientConfig.load', return_value=config), \
+                patch('client.platform_utils.setup_logging'), \
+                patch.object(ClientApp, '_warm_pool'):
+            app = ClientApp()
+        yield app
+        app._status_pool.shutdown(wait=False)
+        app._cleanup_session()
+    
+    def test_restart_waits_after_auto_heal_stopped(self, app):
+        """停止自动治愈后，交互式重启仍应轮询等待各步骤就绪"""
+        app.stop_auto_heal()
+        assert app._stop_event.is_set()
+        
+        calls = {"app": 0, "stopped": 0, "running": 0}
+        
+        def ready_on_third(key):
+            def predicate():
+                calls[key] += 1
+                return calls[key] >= 3
+            return predicate
+        
+        with patch.object(app, 'stop_zerotier_app'), \
+                patch.object(app, 'stop_zerotier_service'), \
+                patch.object(app, 'start_zerotier_service', return_value=True), \
+                patch.object(app, 'start_zerotier_app', return_value=True), \
+                patch.object(app, '_app_stopped', ready_on_third("app")), \
+                patch.object(app, '_service_stopped', ready_on_third("stopped")), \
+                patch.object(app, '_service_running', ready_on_third("running")):
+            assert app.restart_strategy() is True
+        
+        assert calls == {"app": 3, "stopped": 3, "running": 3}
+    
+    def test_send_retries_only_stale_idempotent_requests(self, app):
+        """只有复用连接失效的幂等请求才重建会话并重发"""
+        import http.client
+        from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+        
+        stale = requests.exceptions.ConnectionError(
+            ProtocolError("Connection aborted.", http.client.RemoteDisconnected("closed")))
+        refused = requests.exceptions.ConnectionError(
+            MaxRetryError(None, "/health", NewConnectionError(None, "refused")))
+        ok = MagicMock(status_code=200)
+        session = MagicMock()
+        
+        with patch.object(app, '_ensure_session', return_value=session):
+            # GET 遇到失效连接：标记会话、重试一次成功
+            session.request.side_effect = [stale, ok]
+            assert app._send('GET', 'health', timeout=1) is ok
+            assert session.request.call_count == 2
+            assert app._session_poisoned is True
+            
+            # POST 遇到失效连接：标记会话但不重发
+            app._session_poisoned = False
+            session.request.reset_mock()
+            session.request.side_effect = [stale, ok]
+            with pytest.raises(requests.exceptions.ConnectionError):
+                app._send('POST', 'remember', data=b'{}', timeout=1)
+            assert session.request.call_count == 1
+            assert app._session_poisoned is True
+            
+            # 无法建立新连接：不重建会话也不重发
+            app._session_poisoned = False
+            session.request.reset_mock()
+            session.request.side_effect = [refused, ok]
+            with pytest.raises(requests.exceptions.ConnectionError):
+                app._send('GET', 'health', timeout=1)
+            assert session.request.call_count == 1
+            assert app._session_poisoned is False
+    
+    def test_probe_server_ready_requires_success_status(self, app):
+        """就绪探测只接受 2xx（及旧版服务端的 405），重启时只认新启动的实例"""
+        for status, expected in ((200, True), (405, True), (404, False), (502, False)):
+            response = MagicMock(status_code=status, ok=status < 400)
+            with patch('client.app.requests.head', return_value=response):
+                assert app._probe_server_ready() is expected, status
+        
+        launched_at = time.monotonic() - 2
+        for uptime, expected in ((1.0, True), (3600.0, False)):
+            response = MagicMock(status_code=200, ok=True, content=b'{"uptime_seconds": %f}' % uptime)
+            with patch('client.app.requests.get', return_value=response):
+                assert app._probe_server_ready(launched_at=launched_at) is expected, uptime
+    
+    def test_breaker_backoff_half_open_and_reset(self, app):
+        """熔断时间按连续失败次数翻倍（有上限），期满半开放行，收到响应后复位"""
+        clock = [1000.0]
+        with patch('client.app._now', lambda: clock[0]):
+            assert app._breaker_allow()
+            open_secs = []
+            for _ in range(6):
+                app._breaker_trip()
+                open_secs.append(app._breaker_open_until - clock[0])
+            assert open_secs == [30, 60, 120, 240, 480, 480]
+            
+            assert not app._breaker_allow()
+            clock[0] += 479.9
+            assert not app._breaker_allow()
+            clock[0] += 0.1
+            assert app._breaker_allow()  # 半开：放行一次探测
+            
+            app._breaker_reset()
+            assert app._breaker_failures == 0
+            app._breaker_trip()
+            assert app._breaker_open_until - clock[0] == 30
+    
+    def test_breaker_counts_only_background_failures(self, app):
+        """交互请求失败不计入熔断器，后台请求失败才计入"""
+        session = MagicMock()
+        session.request.side_effect = requests.exceptions.ConnectTimeout("timeout")
+        with patch.object(app, '_ensure_session', return_value=session):
+            with pytest.raises(requests.exceptions.ConnectTimeout):
+                app._send('GET', 'health', timeout=1)
+            assert app._breaker_failures == 0
+            
+            with pytest.raises(requests.exceptions.ConnectTimeout):
+                app._send('POST', 'remember', background=True, data=b'{}', timeout=1)
+            assert app._breaker_failures == 1
+            
+            # 任何 HTTP 响应都说明服务端可达，关闭熔断器
+            session.request.side_effect = None
+            session.request.return_value = MagicMock(status_code=200)
+            app._send('GET', 'health', timeout=1)
+            assert app._breaker_failures == 0
+    
+    def test_remember_after_restart_bypasses_open_breaker(self, app):
+        """熔断期间的上报推迟为待上报；重启后的上报忽略熔断器"""
+        clock = [1000.0]
+        with patch('client.app._now', lambda: clock[0]), \
+                patch.object(app, '_do_silent_remember', return_value=True) as do_remember:
+            app._breaker_trip()
+            assert app._silent_remember_self() is False
+            do_remember.assert_not_called()
+            assert app._remember_pending is True
+            
+            assert app._silent_remember_self(force=True) is True
+            do_remember.assert_called_once()
+            assert app._remember_pending is False
+    
+    def test_failed_remember_backs_off_without_tripping_breaker(self, app):
+        """非网络原因的上报失败只让补报自身退避，不打开熔断器；期满后补报成功即清除待上报"""
+        clock = [1000.0]
+        with patch('client.app._now', lambda: clock[0]), \
+                patch.object(app, '_do_silent_remember', return_value=False) as do_remember:
+            assert app._silent_remember_self(force=True) is False
+            assert app._remember_pending is True
+            assert app._breaker_allow()
+            assert app._breaker_failures == 0
+            
+            assert app._silent_remember_self() is False
+            assert do_remember.call_count == 1
+            
+            # 连续失败时退避时间翻倍
+            clock[0] += CIRCUIT_BREAKER_BASE_SEC
+            assert app._silent_remember_self() is False
+            assert do_remember.call_count == 2
+            clock[0] += CIRCUIT_BREAKER_BASE_SEC
+            assert app._silent_remember_self() is False
+            assert do_remember.call_count == 2
+            
+            clock[0] += CIRCUIT_BREAKER_BASE_SEC
+            do_remember.return_value = True
+            assert app._silent_remember_self() is True
+            assert app._remember_pending is False
+            assert app._remember_failures == 0
+    
+    def test_remember_retry_waits_for_open_breaker(self, app):
+        """网络错误打开熔断器后，即使补报自身退避期满也要等熔断器放行"""
+        clock = [1000.0]
+        with patch('client.app._now', lambda: clock[0]), \
+                patch.object(app, '_do_silent_remember', return_value=False) as do_remember:
+            app._remember_pending = True
+            app._breaker_trip()
+            app._breaker_trip()  # 熔断 2 * CIRCUIT_BREAKER_BASE_SEC
+            assert not app._remember_retry_allow()
+            clock[0] += CIRCUIT_BREAKER_BASE_SEC
+            assert app._silent_remember_self() is False
+            assert do_remember.call_count == 0
+            clock[0] += CIRCUIT_BREAKER_BASE_SEC
+            assert app._remember_retry_allow()
+    
+    def test_probe_result_dropped_when_invalidated_mid_probe(self, app):
+        """探测进行中缓存被清空时，旧结果返回给调用方但不写入缓存"""
+        def stale_probe():
+            app._invalidate_probes()  # 模拟探测期间用户启停了 ZeroTier
+            return "running"
+        
+        assert app._cached('service', 60, stale_probe) == "running"
+        assert 'service' not in app._probe_cache
+        
+        probe = MagicMock(return_value="stopped")
+        assert app._cached('service', 60, probe) == "stopped"
+        assert app._cached('service', 60, probe) == "stopped"
+        assert probe.call_count == 1
+    
+    def test_restart_token_bucket_blocks_and_refills(self, app):
+        """令牌耗尽后暂停重启，ping 成功补充令牌后恢复，且不超过桶容量"""
+        frozen = app._restart_tokens_at
+        with patch('client.app._now', lambda: frozen):  # 冻结时钟，排除按时间补充
+            for _ in range(int(RESTART_TOKEN_MAX)):
+                assert app._take_restart_token() is True
+            assert app._take_restart_token() is False
+            assert app._restart_tokens_exhausted is True
+            
+            # 补充不足一个令牌时仍然阻止重启
+            for _ in range(5):
+                app._refill_restart_token()
+            assert app._take_restart_token() is False
+            
+            for _ in range(int(1 / RESTART_TOKEN_REFILL)):
+                app._refill_restart_token()
+            assert app._take_restart_token() is True
+            assert app._restart_tokens_exhausted is False
+            
+            for _ in range(1000):
+                app._refill_restart_token()
+            assert app._restart_tokens == RESTART_TOKEN_MAX
+    
+    def test_restart_token_bucket_refills_over_time_without_ping(self, app):
+        """ping 一直失败时令牌也会随时间补充，自动治愈不会永久停止重启"""
+        clock = [app._restart_tokens_at]
+        refill_period = max(10, app.config.restart_cooldown_sec) * RESTART_TOKEN_REFILL_COOLDOWNS
+        with patch('client.app._now', lambda: clock[0]):
+            for _ in range(int(RESTART_TOKEN_MAX)):
+                assert app._take_restart_token() is True
+            assert app._take_restart_token() is False
+            
+            clock[0] += refill_period * 0.9
+            assert app._take_restart_token() is False
+            clock[0] += refill_period * 0.1
+            assert app._take_restart_token() is True
+            assert app._take_restart_token() is False
+            
+            # 按时间补充同样不超过桶容量
+            clock[0] += refill_period * 100
+            for _ in range(int(RESTART_TOKEN_MAX)):
+                assert app._take_restart_token() is True
+            assert app._take_restart_token() is False
+    
+    def test_log_rate_limiter_suppresses_and_reports_count(self):
+        """超过突发上限后抑制日志，令牌补充后放行并汇报被抑制的条数"""
+        clock = [1000.0]
+        with patch('client.app._now', lambda: clock[0]):
+            limiter = _LogRateLimiter(burst=3, refill_sec=60)
+            assert [limiter.allow('ping') for _ in range(3)] == [0, 0, 0]
+            assert [limiter.allow('ping') for _ in range(4)] == [None] * 4
+            
+            # 不同的键互不影响
+            assert limiter.allow('other') == 0
+            
+            clock[0] += 30
+            assert limiter.allow('ping') is None  # 仅补充半个令牌
+            clock[0] += 30
+            assert limiter.allow('ping') == 5
+            assert limiter.allow('ping') is None
+
+
 if __name__ == "__main__":
     # 运行集成测试
     pytest.main([__file__, "-v", "-m", "integration"])
@@ -10,7 +10,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.absolute()
 sys.path.insert(0, str(project_root))
 
-from common.network_utils import ping, validate_ip_address, is_private_ip, format_host_for_display
+from common.network_utils import ping, fast_ping, validate_ip_address, is_private_ip, format_host_for_display
 
 
 class TestNetworkUtils:
@@ -26,6 +26,39 @@ class TestNetworkUtils:
         # 测试无效主机（应该失败）
         assert ping("invalid-host-12345.nonexistent", timeout_sec=1) is False
     
+    def test_fast_ping_refused_counts_as_reachable(self):
+        """测试快速探测：TCP 连接被拒绝说明主机在线"""
+        import socket
+        from unittest.mock import patch
+        
+        with patch("common.network_utils.socket.create_connection",
+                   side_effect=ConnectionRefusedError), \
+                patch("common.network_utils.ping") as mock_ping:
+            assert fast_ping("10.147.17.1", timeout_sec=1) is True
+            mock_ping.assert_not_called()
+        
+        # TCP 超时无法判定时回退到 ping；TCP 探测只占用很短的超时
+        with patch("common.network_utils.socket.create_connection",
+                   side_effect=socket.timeout) as mock_connect, \
+                patch("common.network_utils.ping", return_value=False) as mock_ping:
+            assert fast_ping("10.147.17.1", timeout_sec=3) is False
+            assert mock_connect.call_args.kwargs["timeout"] == 0.5
+            mock_ping.assert_called_once_with("10.147.17.1", 3, None)
+    
+    def test_fast_ping_cancel_skips_ping_subprocess(self):
+        """设置取消事件后，TCP 探测无法判定时不再启动 ping 子进程"""
+        import socket
+        import threading
+        from unittest.mock import patch
+        
+        cancel = threading.Event()
+        cancel.set()
+        with patch("common.network_utils.socket.create_connection",
+                   side_effect=socket.timeout), \
+                patch("common.network_utils._run_ping") as mock_run:
+            assert fast_ping("10.147.17.1", timeout_sec=1, cancel=cancel) is False
+            mock_run.assert_not_called()
+    
     @pytest.mark.parametrize("ip,expected", [
         ("192.168.1.1", True),      # 有效私网IP
         ("8.8.8.8", True),          # 有效公网IP
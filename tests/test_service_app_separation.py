@@ -87,6 +87,57 @@ def test_status_functions():
     except Exception as e:
         print(f"状态检查出错: {e}")
 
+def test_process_scan_cache_expires():
+    """进程扫描结果缓存 1 秒：期间复用并剔除已退出的进程，过期后重新遍历进程表"""
+    from unittest.mock import MagicMock, patch
+    import client.platform_utils as platform_utils
+    
+    def fake_process(pid):
+        process = MagicMock()
+        process.info = {"name": "zerotier-one_x64.exe", "pid": pid}
+        process.is_running.return_value = True
+        return process
+    
+    first, second = fake_process(1), fake_process(2)
+    clock = [1000.0]
+    platform_utils.invalidate_process_scan()
+    try:
+        with patch.object(platform_utils.time, 'monotonic', lambda: clock[0]), \
+                patch.object(platform_utils.psutil, 'process_iter', return_value=[first, second]) as mock_iter:
+            services, guis = platform_utils._scan_zerotier_processes()
+            assert services == [first, second] and guis == []
+            
+            # 缓存有效期内不重新遍历，已退出的进程被剔除
+            second.is_running.return_value = False
+            clock[0] += 0.5
+            services, _ = platform_utils._scan_zerotier_processes()
+            assert services == [first]
+            assert mock_iter.call_count == 1
+            
+            clock[0] += platform_utils._PROCESS_SCAN_TTL_SEC
+            platform_utils._scan_zerotier_processes()
+            assert mock_iter.call_count == 2
+    finally:
+        platform_utils.invalidate_process_scan()
+
+def test_missing_executable_invalidates_discovered_paths():
+    """启动时找不到可执行文件应清除路径发现缓存，下次发现重新扫描"""
+    from unittest.mock import patch
+    import client.platform_utils as platform_utils
+    
+    with patch.object(platform_utils, '_scan_zerotier_paths',
+                      return_value={'service_bin': [], 'gui_bin': [], 'service_names': []}) as mock_scan:
+        platform_utils.invalidate_zerotier_paths()
+        platform_utils.discover_zerotier_paths()
+        platform_utils.discover_zerotier_paths()
+        assert mock_scan.call_count == 1
+        
+        config = ClientConfig(zerotier_gui_paths=[], zerotier_bin_paths=[])
+        assert platform_utils.start_app(config) is False
+        platform_utils.discover_zerotier_paths()
+        assert mock_scan.call_count == 2
+    platform_utils.invalidate_zerotier_paths()
+
 def test_process_classification():
     """测试进程分类逻辑"""
     print("=== 测试进程分类逻辑 ===")